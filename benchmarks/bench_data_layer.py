@@ -0,0 +1,208 @@
+"""Benchmark of the UserManager/ToDoListManager data paths.
+
+Seeds N users x M tasks, times each manager operation and writes
+p50/p95/p99 latency and round trips per call as JSON.
+
+    python benchmarks/bench_data_layer.py --backend sqlite --users 20 --tasks 500
+    python benchmarks/bench_data_layer.py --backend mongo --output bench.json
+
+With --backend mongo the data is written to the TODO_MONGO_DB database
+(default "todo_list_bench"), which is dropped afterwards. With --backend
+sqlite a temporary database file is used; round trips are then the number
+of SQL statements executed.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from common import SRC_DIR, git_commit, latency_summary
+
+
+class RoundTripCounter:
+    """Counts database round trips issued by the managers"""
+    def __init__(self):
+        self.count = 0
+
+    def install(self, backend):
+        """Hook the counter into the storage backend (before the first connection)"""
+        if backend == "mongo":
+            from pymongo import monitoring
+
+            counter = self
+
+            class _Listener(monitoring.CommandListener):
+                def started(self, event):
+                    counter.count += 1
+
+                def succeeded(self, event):
+                    pass
+
+                def failed(self, event):
+                    pass
+
+            monitoring.register(_Listener())
+        else:
+            from storage_sqlite import SQLiteDatabase
+            SQLiteDatabase()._connection.set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        self.count += 1
+
+
+def measure(name, operation, calls, counter, results, prepare=None):
+    """Run operation calls times and store its latency and round-trip statistics"""
+    durations = []
+    round_trips = 0
+    for i in range(calls):
+        if prepare:
+            prepare(i)
+        before = counter.count
+        start = time.perf_counter()
+        operation(i)
+        durations.append((time.perf_counter() - start) * 1000)
+        round_trips += counter.count - before
+    results[name] = {
+        **latency_summary(durations),
+        "round_trips_per_call": round(round_trips / calls, 2),
+    }
+
+
+def run(args):
+    """Seed the database, run every benchmark and return the report"""
+    counter = RoundTripCounter()
+    if args.backend == "mongo":
+        counter.install("mongo")
+
+    from Class import Task, UserManager, ToDoListManager, Repositories, query_cache
+    from generators import seed
+
+    if args.backend == "sqlite":
+        counter.install("sqlite")
+
+    user_manager = UserManager()
+    task_repository = Repositories().tasks
+
+    seed_start = time.perf_counter()
+    usernames = seed(user_manager, task_repository, Task, args.users, args.tasks, seed_value=args.seed)
+    seed_seconds = time.perf_counter() - seed_start
+
+    if args.backend == "mongo":
+        # Hasil benchmark tidak berarti jika salah satu query jatuh ke COLLSCAN
+        from storage_mongo import DatabaseConnection
+        DatabaseConnection().check_manager_queries(usernames[0])
+
+    rng = random.Random(args.seed)
+    managers = {username: ToDoListManager(username) for username in usernames}
+    pick_user = lambda i: usernames[rng.randrange(len(usernames))]
+    results = {}
+
+    # display_tasks: sapuan tipe + satu halaman per tab, tanpa cache
+    def display_tasks(i):
+        manager = managers[pick_user(i)]
+        manager.update_task_types()
+        manager.load_task_pages()
+
+    measure("display_tasks", display_tasks, args.calls, counter, results,
+            prepare=lambda i: query_cache.clear())
+
+    # update_task_types dengan sapuan dipaksa berjalan
+    def update_task_types(i):
+        manager = managers[pick_user(i)]
+        manager._invalidate_next_transition()
+        manager.update_task_types()
+
+    measure("update_task_types", update_task_types, args.calls, counter, results)
+
+    # update_task_types ketika batas transisi belum tercapai
+    measure("update_task_types_skipped",
+            lambda i: managers[pick_user(i)].update_task_types(),
+            args.calls, counter, results)
+
+    measure("add_daily_points",
+            lambda i: user_manager.add_daily_points(rng.randint(1, 15), pick_user(i)),
+            args.calls, counter, results)
+
+    measure("get_daily_points",
+            lambda i: user_manager.get_daily_points(pick_user(i)),
+            args.calls, counter, results, prepare=lambda i: query_cache.clear())
+
+    measure("get_daily_points_cached",
+            lambda i: user_manager.get_daily_points(usernames[0]),
+            args.calls, counter, results)
+
+    # Leaderboard tanpa cache: top-N dan peringkat dibaca dari index rollup mingguan
+    measure("get_leaderboard",
+            lambda i: user_manager.get_leaderboard(pick_user(i)),
+            args.calls, counter, results, prepare=lambda i: query_cache.clear())
+
+    # mark_task_done menghapus tugas, jadi setiap panggilan memakai tugas baru
+    done_ids = []
+
+    def prepare_done(i):
+        username = pick_user(i)
+        task = Task("Tugas selesai", "", "sedang", datetime.now() + timedelta(days=3), username)
+        task_repository.insert(task.get_detailed_info())
+        done_ids.append((username, task.task_id))
+
+    measure("mark_task_done",
+            lambda i: managers[done_ids[i][0]].mark_task_done(done_ids[i][1]),
+            args.calls, counter, results, prepare=prepare_done)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "backend": args.backend,
+            "users": args.users,
+            "tasks_per_user": args.tasks,
+            "calls": args.calls,
+            "seed_seconds": round(seed_seconds, 3),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["mongo", "sqlite"], default="sqlite")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per user")
+    parser.add_argument("--calls", type=int, default=200, help="calls per operation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    # Konfigurasi penyimpanan harus diatur sebelum modul aplikasi diimpor
+    os.environ["TODO_STORAGE_BACKEND"] = args.backend
+    os.environ.setdefault("TODO_MONGO_DB", "todo_list_bench")
+    temp_dir = None
+    if args.backend == "sqlite":
+        temp_dir = tempfile.TemporaryDirectory()
+        os.environ["TODO_SQLITE_PATH"] = os.path.join(temp_dir.name, "bench.db")
+    sys.path.insert(0, SRC_DIR)
+
+    try:
+        report = run(args)
+    finally:
+        if args.backend == "mongo":
+            from storage import MONGO_DB_NAME
+            from storage_mongo import DatabaseConnection
+            DatabaseConnection()._client.drop_database(MONGO_DB_NAME)
+        if temp_dir:
+            temp_dir.cleanup()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
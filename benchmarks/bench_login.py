@@ -0,0 +1,115 @@
+"""Login throughput of the password hashers at several cost settings.
+
+Registers users with each hasher setting, then runs logins from
+concurrent simulated sessions and reports logins/sec and login latency
+(p50/p95/p99) per setting as JSON.
+
+    python benchmarks/bench_login.py --scrypt-n 8192 16384 32768 --pbkdf2-iterations 200000 600000
+    python benchmarks/bench_login.py --sessions 16 --workers 8 --logins 200
+
+A temporary SQLite database is used, so the numbers are dominated by the
+hash cost rather than by the database.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from common import SRC_DIR, git_commit, latency_summary
+
+PASSWORD = "bench-password"
+
+
+def measure_setting(user_manager, password_service, hasher, args, usernames):
+    """Register the users with hasher and time args.logins concurrent logins"""
+    password_service.configure(hasher, args.workers)
+
+    start = time.perf_counter()
+    for username in usernames:
+        user_manager.register(username, PASSWORD)
+    register_seconds = time.perf_counter() - start
+
+    def login(i):
+        started = time.perf_counter()
+        success, _ = user_manager.login(usernames[i % len(usernames)], PASSWORD)
+        if not success:
+            raise RuntimeError("benchmark login failed")
+        return (time.perf_counter() - started) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as sessions:
+        durations = list(sessions.map(login, range(args.logins)))
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        "registrations_per_second": round(len(usernames) / register_seconds, 2),
+        "logins_per_second": round(args.logins / wall_seconds, 2),
+        "login_latency": latency_summary(durations),
+    }
+
+
+def run(args):
+    """Measure every requested setting and return the report"""
+    from Class import UserManager
+    from passwords import ScryptHasher, PBKDF2Hasher, password_service
+
+    settings = [(f"scrypt n={n} r={args.scrypt_r} p=1", ScryptHasher(n=n, r=args.scrypt_r, p=1)) for n in args.scrypt_n]
+    settings += [(f"pbkdf2_sha256 iterations={i}", PBKDF2Hasher(iterations=i)) for i in args.pbkdf2_iterations]
+
+    user_manager = UserManager()
+    results = {}
+    for index, (name, hasher) in enumerate(settings):
+        # Pengguna baru per setting, agar login tidak memicu upgrade hash dari setting sebelumnya
+        usernames = [f"bench_login_{index}_{i}" for i in range(args.users)]
+        results[name] = measure_setting(user_manager, password_service, hasher, args, usernames)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "users": args.users,
+            "logins": args.logins,
+            "sessions": args.sessions,
+            "hash_workers": args.workers,
+            "cpu_count": os.cpu_count(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scrypt-n", type=int, nargs="*", default=[2 ** 13, 2 ** 14, 2 ** 15])
+    parser.add_argument("--scrypt-r", type=int, default=8)
+    parser.add_argument("--pbkdf2-iterations", type=int, nargs="*", default=[600000])
+    parser.add_argument("--users", type=int, default=10, help="users registered per setting")
+    parser.add_argument("--logins", type=int, default=100, help="logins per setting")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent simulated sessions")
+    parser.add_argument("--workers", type=int, default=4, help="size of the hashing pool")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.TemporaryDirectory()
+    os.environ["TODO_STORAGE_BACKEND"] = "sqlite"
+    os.environ["TODO_SQLITE_PATH"] = os.path.join(temp_dir.name, "bench.db")
+    sys.path.insert(0, SRC_DIR)
+
+    try:
+        report = run(args)
+    finally:
+        temp_dir.cleanup()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
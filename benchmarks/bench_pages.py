@@ -0,0 +1,225 @@
+"""End-to-end page latency harness for the Streamlit app.
+
+Drives main.py through Streamlit's headless AppTest for K concurrent
+simulated sessions, each in its own process because AppTest keeps a
+global runtime per run: login, Beranda, add task, list tasks and complete
+task. Reports per-page render time and per-action latency as JSON. Action
+latency is wall-clock and so includes any time.sleep in the app; those
+sleeps are also reported separately per source line.
+
+    python benchmarks/bench_pages.py --sessions 8 --iterations 5 --tasks 200
+
+The embedded SQLite backend in a temporary file is used as the local
+database stand-in unless --backend mongo is given.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from datetime import date, time as dt_time, timedelta, datetime
+
+from common import SRC_DIR, git_commit, latency_summary
+
+MAIN_SCRIPT = os.path.join(SRC_DIR, "main.py")
+PASSWORD = "bench"
+
+
+class SleepTracker:
+    """Wraps time.sleep to record sleeps issued by the app code under src/"""
+    def __init__(self):
+        self._original_sleep = time.sleep
+        self._lock = threading.Lock()
+        self.calls = defaultdict(lambda: {"calls": 0, "seconds": 0.0})
+
+    def install(self):
+        time.sleep = self._sleep
+
+    def uninstall(self):
+        time.sleep = self._original_sleep
+
+    def _sleep(self, seconds):
+        # Sleep milik Streamlit sendiri (polling AppTest) tidak dihitung
+        caller = sys._getframe(1)
+        if caller.f_code.co_filename.startswith(SRC_DIR):
+            location = f"{os.path.relpath(caller.f_code.co_filename, SRC_DIR)}:{caller.f_lineno}"
+            with self._lock:
+                self.calls[location]["calls"] += 1
+                self.calls[location]["seconds"] += seconds
+        self._original_sleep(seconds)
+
+    def report(self):
+        """Sleep calls and total milliseconds per source location"""
+        with self._lock:
+            return {
+                location: {"calls": entry["calls"], "total_ms": round(entry["seconds"] * 1000, 3)}
+                for location, entry in self.calls.items()
+            }
+
+
+class SessionRecorder:
+    """Collects page and action timings of one session"""
+    def __init__(self):
+        self.pages = defaultdict(list)
+        self.actions = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def timed_run(self, at, kind, name):
+        """Run the app once and record the duration under pages or actions"""
+        start = time.perf_counter()
+        at.run()
+        duration = (time.perf_counter() - start) * 1000
+        getattr(self, kind)[name].append(duration)
+        if at.exception:
+            self.errors[name] += 1
+
+
+def click(at, label_prefix):
+    """Click the first button whose label starts with label_prefix"""
+    for button in at.button:
+        if button.label.startswith(label_prefix):
+            button.click()
+            return True
+    return False
+
+
+def run_session(username, iterations, recorder):
+    """Simulate one user session from login to completing tasks"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(MAIN_SCRIPT, default_timeout=60)
+    recorder.timed_run(at, "pages", "login")
+
+    at.text_input[0].input(username)
+    at.text_input[1].input(PASSWORD)
+    click(at, "Sign In")
+    recorder.timed_run(at, "actions", "login")
+
+    for i in range(iterations):
+        at.switch_page("views/beranda.py")
+        recorder.timed_run(at, "pages", "beranda")
+
+        at.switch_page("views/tambah_tugas.py")
+        recorder.timed_run(at, "pages", "tambah_tugas")
+        at.text_input[0].input(f"Tugas harness {i}")
+        at.text_area[0].input("Dibuat oleh harness")
+        at.date_input[0].set_value(date.today() + timedelta(days=2))
+        at.time_input[0].set_value(dt_time(12, 0))
+        click(at, "Tambahkan Tugas")
+        recorder.timed_run(at, "actions", "add_task")
+
+        at.switch_page("views/tampilkan_tugas.py")
+        recorder.timed_run(at, "pages", "tampilkan_tugas")
+        if click(at, "Selesaikan"):
+            recorder.timed_run(at, "actions", "complete_task")
+
+
+def session_worker(username, iterations):
+    """Process entry point: run one session and return its raw timings"""
+    sys.path.insert(0, SRC_DIR)
+    sleep_tracker = SleepTracker()
+    recorder = SessionRecorder()
+    sleep_tracker.install()
+    try:
+        run_session(username, iterations, recorder)
+    finally:
+        sleep_tracker.uninstall()
+    return dict(recorder.pages), dict(recorder.actions), dict(recorder.errors), sleep_tracker.report()
+
+
+def run(args):
+    """Seed the users, run the sessions concurrently and return the report"""
+    from Class import Task, get_user_manager, Repositories
+    from generators import seed
+
+    usernames = seed(get_user_manager(), Repositories().tasks, Task,
+                     args.sessions, args.tasks, password=PASSWORD)
+
+    pages, actions = defaultdict(list), defaultdict(list)
+    errors = defaultdict(int)
+    sleeps = defaultdict(lambda: {"calls": 0, "total_ms": 0.0})
+    start = time.perf_counter()
+    # spawn: setiap sesi mendapat proses bersih tanpa koneksi database warisan
+    with ProcessPoolExecutor(max_workers=args.sessions, mp_context=get_context("spawn")) as executor:
+        futures = [
+            executor.submit(session_worker, username, args.iterations)
+            for username in usernames
+        ]
+        for future in futures:
+            session_pages, session_actions, session_errors, session_sleeps = future.result()
+            for name, values in session_pages.items():
+                pages[name].extend(values)
+            for name, values in session_actions.items():
+                actions[name].extend(values)
+            for name, count in session_errors.items():
+                errors[name] += count
+            for location, entry in session_sleeps.items():
+                sleeps[location]["calls"] += entry["calls"]
+                sleeps[location]["total_ms"] += entry["total_ms"]
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "backend": args.backend,
+            "sessions": args.sessions,
+            "iterations": args.iterations,
+            "tasks_per_user": args.tasks,
+            "wall_seconds": round(wall_seconds, 3),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "pages": {name: latency_summary(values) for name, values in pages.items()},
+        "actions": {name: latency_summary(values) for name, values in actions.items()},
+        # Waktu time.sleep di kode aplikasi, sudah termasuk dalam latensi aksi di atas
+        "sleeps": dict(sleeps),
+        "errors": dict(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["mongo", "sqlite"], default="sqlite")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated sessions")
+    parser.add_argument("--iterations", type=int, default=3, help="page cycles per session")
+    parser.add_argument("--tasks", type=int, default=100, help="seeded tasks per user")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    # Konfigurasi penyimpanan harus diatur sebelum modul aplikasi diimpor
+    os.environ["TODO_STORAGE_BACKEND"] = args.backend
+    os.environ.setdefault("TODO_MONGO_DB", "todo_list_bench")
+    # Thread latar (pengarsipan, pemantau perubahan) tidak termasuk latensi aksi halaman;
+    # sleep mereka akan terhitung oleh SleepTracker
+    os.environ["TODO_ARCHIVE_RUN_INTERVAL_MINUTES"] = "0"
+    os.environ["TODO_CHANGE_WATCH"] = "off"
+    temp_dir = None
+    if args.backend == "sqlite":
+        temp_dir = tempfile.TemporaryDirectory()
+        os.environ["TODO_SQLITE_PATH"] = os.path.join(temp_dir.name, "bench.db")
+    sys.path.insert(0, SRC_DIR)
+
+    try:
+        report = run(args)
+    finally:
+        if args.backend == "mongo":
+            from storage import MONGO_DB_NAME
+            from storage_mongo import DatabaseConnection
+            DatabaseConnection()._client.drop_database(MONGO_DB_NAME)
+        if temp_dir:
+            temp_dir.cleanup()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Cold-start import benchmark of the domain module.
+
+Imports Class and the storage backend module in fresh interpreters under
+`python -X importtime`, reports their cumulative import time and the
+slowest dependencies as JSON, and exits non-zero when the median exceeds
+the budget or when a module the domain layer must not load (streamlit,
+pandas, the unused database driver) shows up in the import log.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --backend mongo --budget-ms 250
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+from common import SRC_DIR, git_commit
+
+# Modul yang tidak boleh dimuat oleh lapisan domain, per backend
+FORBIDDEN_MODULES = {
+    "sqlite": ["streamlit", "pandas", "pymongo", "bson"],
+    "mongo": ["streamlit", "pandas", "sqlite3"],
+}
+
+# Anggaran default waktu impor (ms); pymongo sendiri sudah memakan sebagian besar anggaran mongo
+DEFAULT_BUDGET_MS = {"sqlite": 150.0, "mongo": 300.0}
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} of one -X importtime log"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def import_once(backend):
+    """Import Class and the backend module in a new interpreter and return the parsed import log"""
+    env = dict(os.environ, TODO_STORAGE_BACKEND=backend)
+    # Modul backend ikut diimpor (tanpa membuka koneksi), seperti saat Repositories() pertama kali dibuat
+    code = f"import sys; sys.path.insert(0, {SRC_DIR!r}); import Class, storage_{backend}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, cwd=SRC_DIR
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def run(args):
+    """Start args.runs interpreters and return the report"""
+    totals = []
+    self_times = {}
+    modules = {}
+    for _ in range(args.runs):
+        modules = import_once(args.backend)
+        totals.append((modules["Class"][1] + modules[f"storage_{args.backend}"][1]) / 1000)
+        for name, (self_us, _) in modules.items():
+            self_times.setdefault(name, []).append(self_us / 1000)
+
+    slowest = sorted(
+        ((name, statistics.median(values)) for name, values in self_times.items()),
+        key=lambda item: item[1], reverse=True
+    )[:args.top]
+    forbidden = [name for name in FORBIDDEN_MODULES[args.backend] if name in modules]
+    median_ms = statistics.median(totals)
+    budget_ms = args.budget_ms or DEFAULT_BUDGET_MS[args.backend]
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "backend": args.backend,
+            "runs": args.runs,
+            "budget_ms": budget_ms,
+            "python": sys.version.split()[0],
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "import_ms": {
+            "median": round(median_ms, 3),
+            "min": round(min(totals), 3),
+            "max": round(max(totals), 3),
+        },
+        "slowest_modules_self_ms": {name: round(value, 3) for name, value in slowest},
+        "forbidden_modules_loaded": forbidden,
+        "within_budget": median_ms <= budget_ms and not forbidden,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["mongo", "sqlite"], default="sqlite")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--budget-ms", type=float, help="maximum median import time (default per backend)")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to report")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if not report["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
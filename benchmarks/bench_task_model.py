@@ -0,0 +1,161 @@
+"""Per-task CPU time and memory of the task model on large task lists.
+
+Compares the previous read path (raw documents, a plain-__dict__ Task,
+datetime.now() per task and pytz.timezone() per deadline) with the
+current one (__slots__ Task, one shared clock, deadlines formatted once
+per batch) and reports microseconds and bytes per task as JSON.
+
+    python benchmarks/bench_task_model.py --tasks 10000 --repeat 5
+
+No database is used; the documents are built in memory the way the
+storage layer returns them.
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from common import SRC_DIR, git_commit
+from generators import PRIORITY_WEIGHTS, random_deadline
+
+
+class DictTask:
+    """Task as it was before __slots__: a plain __dict__ and its own datetime.now()"""
+    def __init__(self, name, description, priority, deadline, username):
+        self._id = ObjectId()
+        self._name = name
+        self._description = description
+        self._priority = priority
+        self._deadline = deadline
+        self._username = username
+        self._point = random.randint(1, 15)
+        self._status = "ongoing"
+        self._type = self._determine_type()
+
+    def _determine_type(self):
+        now = datetime.now()
+        if now > self._deadline:
+            return "missed"
+        elif (self._deadline - now) <= timedelta(hours=24):
+            return "urgent"
+        return "common"
+
+
+def header_documents(count, rng):
+    """Task headers as returned by load_pages (HEADER_FIELDS plus _id)"""
+    now = datetime.now()
+    priorities = list(PRIORITY_WEIGHTS)
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Tugas {i}",
+            "deadline": random_deadline(rng, now),
+            "priority": rng.choice(priorities),
+            "point": rng.randint(1, 15),
+            "status": "ongoing",
+            "type": "common",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(build, count, repeat):
+    """CPU microseconds per task (best of repeat) and bytes per task retained by build()"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.process_time()
+        result = build()
+        timings.append(time.process_time() - start)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        "cpu_us_per_task": round(min(timings) / count * 1e6, 3),
+        "retained_bytes_per_task": round(retained / count, 1),
+        "peak_bytes_per_task": round(peak / count, 1),
+    }
+
+
+def run(args):
+    """Measure both paths for construction and for loading plus formatting a page"""
+    import pytz
+    from Class import Task, format_deadlines
+
+    rng = random.Random(0)
+    count = args.tasks
+    documents = header_documents(count, rng)
+    deadlines = [document["deadline"] for document in documents]
+
+    def construct_dict():
+        return [DictTask(f"Tugas {i}", "", "sedang", deadline, "bench") for i, deadline in enumerate(deadlines)]
+
+    def construct_slots():
+        # Satu waktu untuk seluruh batch, seperti pada impor
+        now = datetime.now()
+        return [Task(f"Tugas {i}", "", "sedang", deadline, "bench", now=now) for i, deadline in enumerate(deadlines)]
+
+    def load_dict():
+        # Dokumen disalin seperti hasil baru dari database, lalu diformat per tugas
+        tasks = [dict(document) for document in documents]
+        labels = {}
+        for task in tasks:
+            deadline = task["deadline"].astimezone(pytz.timezone('Asia/Jakarta'))
+            labels[task["_id"]] = (deadline, deadline.strftime("%d %b %Y %H:%M"))
+        return tasks, labels
+
+    def load_slots():
+        tasks = [Task.from_document(dict(document), "bench") for document in documents]
+        return tasks, format_deadlines(tasks)
+
+    results = {
+        "construct": {
+            "dict": measure(construct_dict, count, args.repeat),
+            "slots": measure(construct_slots, count, args.repeat),
+        },
+        "load_and_format": {
+            "dict": measure(load_dict, count, args.repeat),
+            "slots": measure(load_slots, count, args.repeat),
+        },
+    }
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "tasks": count,
+            "repeat": args.repeat,
+            "python": sys.version.split()[0],
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000, help="tasks per list")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per path (best is reported)")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    sys.path.insert(0, SRC_DIR)
+    output = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Helpers shared by the benchmarks"""
+import os
+import subprocess
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(durations):
+    """p50/p95/p99 and mean of a list of durations in milliseconds"""
+    durations = sorted(durations)
+    return {
+        "calls": len(durations),
+        "p50_ms": round(percentile(durations, 0.50), 3),
+        "p95_ms": round(percentile(durations, 0.95), 3),
+        "p99_ms": round(percentile(durations, 0.99), 3),
+        "mean_ms": round(sum(durations) / len(durations), 3) if durations else 0.0,
+    }
+
+
+def git_commit():
+    """Current commit hash, so results can be compared between commits"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=SRC_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,53 @@
+"""Synthetic users and tasks for the benchmarks"""
+import random
+from datetime import datetime, timedelta
+
+# Distribusi prioritas: kebanyakan tugas berprioritas rendah
+PRIORITY_WEIGHTS = {"rendah": 0.5, "sedang": 0.35, "tinggi": 0.15}
+
+# Distribusi deadline relatif terhadap sekarang (bobot, jam minimum, jam maksimum)
+DEADLINE_BUCKETS = [
+    (0.10, -24 * 14, -1),      # missed
+    (0.15, 1, 23),             # urgent
+    (0.75, 25, 24 * 30),       # common
+]
+
+
+def benchmark_username(index):
+    """Username of the index-th synthetic user"""
+    return f"bench_user_{index:05d}"
+
+
+def random_deadline(rng, now):
+    """Draw a deadline from DEADLINE_BUCKETS"""
+    weights = [bucket[0] for bucket in DEADLINE_BUCKETS]
+    _, min_hours, max_hours = rng.choices(DEADLINE_BUCKETS, weights=weights)[0]
+    return now + timedelta(hours=rng.uniform(min_hours, max_hours))
+
+
+def generate_tasks(task_cls, username, count, rng, now=None):
+    """Yield count Task objects with realistic priorities and deadlines"""
+    now = now or datetime.now()
+    priorities = list(PRIORITY_WEIGHTS)
+    weights = list(PRIORITY_WEIGHTS.values())
+    for i in range(count):
+        yield task_cls(
+            name=f"Tugas {i}",
+            description=f"Deskripsi tugas {i} milik {username}. " * rng.randint(1, 5),
+            priority=rng.choices(priorities, weights=weights)[0],
+            deadline=random_deadline(rng, now),
+            username=username
+        )
+
+
+def seed(user_manager, task_repository, task_cls, users, tasks_per_user, password="bench", seed_value=0):
+    """Register users and insert their tasks; return the usernames"""
+    rng = random.Random(seed_value)
+    usernames = []
+    for index in range(users):
+        username = benchmark_username(index)
+        user_manager.register(username, password)
+        for task in generate_tasks(task_cls, username, tasks_per_user, rng):
+            task_repository.insert(task.get_detailed_info())
+        usernames.append(username)
+    return usernames
@@ -1,73 +1,146 @@
 import logging
-import hashlib
 import pytz
 import time
-import streamlit as st
-import pandas as pd
-from pymongo import MongoClient
-from datetime import datetime, timedelta, date
+import threading
+from collections import OrderedDict, deque
+from storage import Repositories, DAY_POINT_FIELDS, LEADERBOARD_SIZE, LEADERBOARD_RANK_LIMIT, new_id
+from passwords import password_service
+from datetime import datetime, timedelta
 from abc import ABC
 from random import randint
-from pprint import pprint
-
-
-class DatabaseConnection:
-    """Singleton database connection manager"""
-    _instance = None
-
-    def __new__(cls):
-        if not cls._instance:
-            cls._instance = super().__new__(cls)
-            cls._instance._connect()
-        return cls._instance
-
-    def _connect(self):
-        """Establish database connection"""
-        try:
-            self._client = MongoClient("mongodb://localhost:27017/")
-            self._db = self._client["todo_list"]
-            self._tasks_collection = self._db["tasks"]
-            self._users_collection = self._db["users"]
-            logging.info("Database connection established successfully.")
-        except Exception as e:
-            logging.error(f"Database connection failed: {e}")
-            raise
 
-    @property
-    def tasks_collection(self):
-        """Getter for tasks collection"""
-        return self._tasks_collection
 
-    @property
-    def users_collection(self):
-        """Getter for users collection"""
-        return self._users_collection
+class TTLCache:
+    """Thread-safe per-user cache with TTL, explicit invalidation and hit/miss counters"""
+    def __init__(self, ttl, max_entries=10000):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # Urutan LRU: entri yang paling lama tidak dipakai ada di depan
+        self._entries = OrderedDict()
+        # Generasi per pengguna, dinaikkan setiap invalidasi agar hasil lama tidak tersimpan
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_set(self, username, key, loader):
+        """Return the cached value for (username, key), calling loader on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((username, key))
+            if entry and entry[0] > now:
+                self._hits += 1
+                self._entries.move_to_end((username, key))
+                return entry[1]
+            self._misses += 1
+            generation = self._generations.get(username, 0)
+
+        value = loader()
+
+        with self._lock:
+            # Jangan simpan jika pengguna di-invalidate selama loader berjalan
+            if self._generations.get(username, 0) == generation:
+                self._entries[(username, key)] = (now + self._ttl, value)
+                self._entries.move_to_end((username, key))
+                if len(self._entries) > self._max_entries:
+                    self._evict(now)
+        return value
+
+    def _evict(self, now):
+        """Drop expired entries, then the least recently used ones above max_entries (caller must hold the lock)"""
+        for cache_key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[cache_key]
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username):
+        """Drop every cached entry of a user"""
+        with self._lock:
+            self._generations[username] = self._generations.get(username, 0) + 1
+            for cache_key in [k for k in self._entries if k[0] == username]:
+                del self._entries[cache_key]
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "size": len(self._entries)}
+
+
+class DataVersions:
+    """Per-user change counters that open sessions compare to decide when to rerun
+
+    Every bump remembers its writer (writer_id(), set by the presentation layer
+    to the Streamlit session, None for changes seen by the change watcher), so a
+    session can skip the rerun for bumps made only by its own writes.
+    """
+    # Jumlah bump terakhir per pengguna yang disimpan beserta penulisnya
+    HISTORY = 50
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._writers = {}
+        self.writer_id = lambda: None
+
+    def version(self, username):
+        """Counter that increases whenever the user's data changed"""
+        return self._versions.get(username, 0)
+
+    def bump(self, usernames):
+        """Increase the counters of several users"""
+        writer = self.writer_id()
+        with self._lock:
+            for username in set(usernames):
+                version = self._versions.get(username, 0) + 1
+                self._versions[username] = version
+                self._writers.setdefault(username, deque(maxlen=self.HISTORY)).append((version, writer))
+
+    def written_only_by(self, username, writer, since):
+        """Return True if every bump of a user after version since was made by writer"""
+        with self._lock:
+            version = self._versions.get(username, 0)
+            bumps = [bump_writer for bump_version, bump_writer in self._writers.get(username, ()) if bump_version > since]
+        return writer is not None and len(bumps) == version - since and all(bump_writer == writer for bump_writer in bumps)
+
+    def usernames(self):
+        """Users whose counter was ever bumped"""
+        with self._lock:
+            return list(self._versions)
+
+
+# Cache hasil query per pengguna (poin harian dan daftar tugas)
+query_cache = TTLCache(ttl=60)
+# Cache manager tingkat proses
+manager_cache = TTLCache(ttl=3600)
+# Versi data per pengguna (lihat change_watcher.py dan components/live_refresh.py)
+data_versions = DataVersions()
+
 
 class UserManager:
     """Manages user authentication and point tracking"""
     def __init__(self):
-        self._db_connection = DatabaseConnection()
-        self._users_collection = self._db_connection.users_collection
-        self._current_user = None
-        
-    def set_current_user(self, username):
-        self._current_user = self._users_collection.find_one({"username": username})
-
-    def _hash_password(self, password):
-        """Hash password for secure storage"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        repositories = Repositories()
+        self._users = repositories.users
+        self._points = repositories.points
 
     def register(self, username, password):
         """Register a new user"""
         # Check if username already exists
-        existing_user = self._users_collection.find_one({"username": username})
+        existing_user = self._users.find_by_username(username)
         if existing_user:
             return False, "Username already exists"
 
         # Create user with initial point structure
         user_data = {
             "username": username,
-            "password": self._hash_password(password),
+            # Hash dihitung di pool hashing, bukan di thread skrip
+            "password": password_service.hash(password),
             "point_senin": 0,
             "point_selasa": 0,
             "point_rabu": 0,
@@ -78,134 +151,223 @@ class UserManager:
             "last_point_reset": datetime.now(pytz.timezone('Asia/Jakarta'))
         }
         
-        self._users_collection.insert_one(user_data)
+        if not self._users.insert(user_data):
+            return False, "Username already exists"
         return True, "Registration successful"
 
     def login(self, username, password):
         """Authenticate user"""
-        hashed_password = self._hash_password(password)
-        user = self._users_collection.find_one({
-            "username": username, 
-            "password": hashed_password
-        })
-        
-        if user:
-            self._current_user = user
-            return True, "Login successful"
-        return False, "Invalid username or password"
-
-    def _reset_points_if_needed(self):
-        """Reset points based on day and time (Monday at 01:00 AM)"""
-        if not self._current_user:
-            print("No current user found. Exiting function.")
-            return
+        # Ambil pengguna lewat index username, lalu verifikasi hash di pool hashing
+        user = self._users.find_by_username(username)
+        matches, new_hash = password_service.verify(password, user["password"] if user else None)
+        if not matches:
+            return False, "Invalid username or password"
+
+        if new_hash:
+            # Hash lama (SHA-256 tanpa salt atau parameter biaya lama) diperbarui secara transparan
+            self._users.update_password(username, new_hash)
+            user["password"] = new_hash
+        return True, "Login successful"
+
+    # Field poin untuk setiap hari, diindeks dengan datetime.weekday()
+    _DAY_POINT_FIELDS = DAY_POINT_FIELDS
+
+    @staticmethod
+    def _current_week_start(current_time):
+        """Return this week's reset boundary (Monday at 01:00 AM)"""
+        week_start = (current_time - timedelta(days=current_time.weekday())).replace(
+            hour=1, minute=0, second=0, microsecond=0
+        )
+        # Senin sebelum jam 01:00 masih termasuk minggu sebelumnya
+        if current_time < week_start:
+            week_start -= timedelta(days=7)
+        return week_start
+
+    def add_daily_points(self, points, username, task_names=None):
+        """Add points for the current day, resetting the week first if needed"""
+        if not username:
+            raise ValueError("Username harus ditentukan.")
 
         # Ambil waktu sekarang dalam zona waktu Jakarta
         current_time = datetime.now(pytz.timezone('Asia/Jakarta'))
-        print("\nCurrent Time Details:")
-        print("=" * 40)
-        print(f"Current time: {current_time}")
-
-        # Ambil waktu reset terakhir dari database, jika tidak ada gunakan default 1970-01-01
-        timezone = pytz.timezone('Asia/Jakarta')
-        default_last_reset = timezone.localize(datetime(1970, 1, 1))
-        last_reset = self._current_user.get('last_point_reset', default_last_reset)
-        print(f"Last reset time: {last_reset}")
-
-        # Periksa jika waktu sekarang adalah hari Senin setelah jam 01:00 pagi dan reset belum dilakukan hari ini
-        is_monday_noon_or_later = current_time.weekday() == 0 and current_time.hour >= 1
-        reset_not_done_today = last_reset.date() != current_time.date()
-        print(f"Is Monday after noon: {is_monday_noon_or_later}")
-        print(f"Has reset been done today: {reset_not_done_today}")
-        print("=" * 40)
-
-        if is_monday_noon_or_later and reset_not_done_today:
-            # Reset semua poin untuk semua hari
-            update = {
-                "point_senin": 0,
-                "point_selasa": 0,
-                "point_rabu": 0,
-                "point_kamis": 0,
-                "point_jumat": 0,
-                "point_sabtu": 0,
-                "point_minggu": 0,
-                "last_point_reset": current_time
-            }
-
-            print("\nReset Points and Last Reset Time:")
-            pprint(update)
-            print("=" * 40)
 
-            # Update data pengguna di database
-            result = self._users_collection.update_one(
-                {"username": self._current_user['username']},
-                {"$set": update}
-            )
-            print("\nDatabase Update Result:")
-            print("=" * 40)
-            print(f"Modified Documents: {result.modified_count}")
-            print("=" * 40)
-
-            # Refresh data pengguna aktif
-            self._current_user = self._users_collection.find_one(
-                {"username": self._current_user['username']}
-            )
-            print("\nCurrent User Data After Refresh:")
-            pprint(self._current_user)
-            print("=" * 40)
+        # Reset mingguan dan penambahan poin dalam satu operasi atomik
+        user = self._users.add_points(
+            username,
+            self._DAY_POINT_FIELDS[current_time.weekday()],
+            points,
+            self._current_week_start(current_time),
+            current_time
+        )
+        if not user:
+            raise ValueError(f"Pengguna dengan username '{username}' tidak ditemukan.")
 
-    def add_daily_points(self, points, username):
-        """Add points for the current day"""
-        if not username:
-            raise ValueError("Username harus ditentukan.")
+        self._record_points_history(points, username, current_time, task_names)
+        query_cache.invalidate(username)
+        data_versions.bump([username])
+        self.invalidate_leaderboard()
+        logging.debug(
+            "Added %s points for '%s' on %s (last reset: %s)",
+            points, username, current_time, user.get("last_point_reset")
+        )
+        return True
 
-        # Set current user
-        self.set_current_user(username)
-        if not self._current_user:
-            raise ValueError(f"Pengguna dengan username '{username}' tidak ditemukan.")
+    @staticmethod
+    def _day_key(current_time):
+        """Return the rollup key (midnight) for the day of current_time"""
+        return datetime(current_time.year, current_time.month, current_time.day)
 
-        # Ensure points are reset if needed
-        self._reset_points_if_needed()
-
-        # Determine the current day's point field
-        today = datetime.now(pytz.timezone('Asia/Jakarta'))
-        day_points_map = {
-            0: "point_senin", 
-            1: "point_selasa", 
-            2: "point_rabu", 
-            3: "point_kamis", 
-            4: "point_jumat", 
-            5: "point_sabtu",
-            6: "point_minggu"
-        }
-        point_field = day_points_map[today.weekday()]
+    def _record_points_history(self, points, username, current_time, task_names=None):
+        """Append a ledger entry and update the daily and weekly rollups"""
+        day_key = self._day_key(current_time)
+        week_start = self._current_week_start(current_time)
+        point_field = self._DAY_POINT_FIELDS[current_time.weekday()]
 
-        # Update points
-        self._users_collection.update_one(
-            {"username": username},
-            {"$inc": {point_field: points}}
+        self._points.record(
+            {
+                "username": username,
+                "points": points,
+                "task_names": task_names or [],
+                "awarded_at": current_time,
+                "date": day_key,
+                "week_start": week_start
+            },
+            point_field
         )
-        return True
 
     def get_daily_points(self, username):
-        user_data = self._users_collection.find_one({"username": username})  # Pastikan username terisi
-        if user_data:
-            points = {
-                "Senin": user_data.get("point_senin", 0),
-                "Selasa": user_data.get("point_selasa", 0),
-                "Rabu": user_data.get("point_rabu", 0),
-                "Kamis": user_data.get("point_kamis", 0),
-                "Jumat": user_data.get("point_jumat", 0),
-                "Sabtu": user_data.get("point_sabtu", 0),
-                "Minggu": user_data.get("point_minggu", 0),
+        """Get this week's points per day (cached per user)"""
+        return query_cache.get_or_set(
+            username, ("daily_points",), lambda: self._load_daily_points(username)
+        )
+
+    def _load_daily_points(self, username):
+        """Get this week's points per day from the weekly rollup"""
+        current_time = datetime.now(pytz.timezone('Asia/Jakarta'))
+        week_start = self._current_week_start(current_time)
+        source = self._points.find_week(username, week_start)
+        if not source:
+            # Belum ada rollup minggu ini: pakai field poin di dokumen pengguna
+            source = self._users.find_by_username(username)  # Pastikan username terisi
+            if not source:
+                return None
+            # Field poin baru direset pada poin pertama minggu ini; sebelum itu isinya milik minggu lalu
+            last_reset = source.get("last_point_reset")
+            if last_reset is not None and last_reset.tzinfo is None:
+                # Penyimpanan mengembalikan datetime naive dalam UTC
+                last_reset = pytz.utc.localize(last_reset)
+            if last_reset is None or last_reset < week_start:
+                source = {}
+        points = {
+            "Senin": source.get("point_senin", 0),
+            "Selasa": source.get("point_selasa", 0),
+            "Rabu": source.get("point_rabu", 0),
+            "Kamis": source.get("point_kamis", 0),
+            "Jumat": source.get("point_jumat", 0),
+            "Sabtu": source.get("point_sabtu", 0),
+            "Minggu": source.get("point_minggu", 0),
+        }
+        return points
+
+    def get_weekly_points(self, username, weeks=4):
+        """Get total points for each of the last N weeks (oldest first)"""
+        current_time = datetime.now(pytz.timezone('Asia/Jakarta'))
+        current_week = self._current_week_start(current_time)
+        week_starts = [current_week - timedelta(weeks=i) for i in range(weeks - 1, -1, -1)]
+
+        rollups = self._points.find_weeks(username, week_starts[0])
+        # Penyimpanan mengembalikan datetime naive dalam UTC
+        totals = {doc["week_start"]: doc.get("total", 0) for doc in rollups}
+        return [
+            {
+                "week_start": week_start,
+                "total": totals.get(week_start.astimezone(pytz.utc).replace(tzinfo=None), 0)
             }
-            return points
-        return None
+            for week_start in week_starts
+        ]
+
+    # Entri cache leaderboard dibagi oleh semua pengguna, disimpan di bawah kunci ini
+    _LEADERBOARD_CACHE_KEY = "__leaderboard__"
+
+    def get_leaderboard(self, username, size=LEADERBOARD_SIZE):
+        """Get this week's top users and the standing of username (cached across users)"""
+        week_start = self._current_week_start(datetime.now(pytz.timezone('Asia/Jakarta')))
+        top = query_cache.get_or_set(
+            self._LEADERBOARD_CACHE_KEY, ("top", week_start, size),
+            lambda: self._points.top_week(week_start, size)
+        )
+        standing = query_cache.get_or_set(
+            self._LEADERBOARD_CACHE_KEY, ("standing", username, week_start),
+            lambda: self._load_standing(username, week_start)
+        )
+        return {"week_start": week_start, "top": top, "user": standing}
+
+    def _load_standing(self, username, week_start):
+        """Weekly total and rank (1 = highest) of a user, or None without points this week
+
+        rank is None when LEADERBOARD_RANK_LIMIT or more users are ahead.
+        """
+        week = self._points.find_week(username, week_start)
+        if not week or not week.get("total"):
+            return None
+        # Peringkat = 1 + jumlah pengguna dengan total lebih tinggi (nilai sama berbagi peringkat)
+        above = self._points.count_week_above(week_start, week["total"], LEADERBOARD_RANK_LIMIT)
+        return {
+            "total": week["total"],
+            "rank": above + 1 if above < LEADERBOARD_RANK_LIMIT else None
+        }
+
+    @classmethod
+    def invalidate_leaderboard(cls):
+        """Drop the cached leaderboard after points changed"""
+        query_cache.invalidate(cls._LEADERBOARD_CACHE_KEY)
+
+    def get_monthly_points(self, username, year, month):
+        """Get points for every day of a month, e.g. for a heatmap"""
+        first_day = datetime(year, month, 1)
+        next_month = datetime(year + month // 12, month % 12 + 1, 1)
+
+        rollups = self._points.find_days(username, first_day, next_month)
+        totals = {doc["date"].date(): doc.get("points", 0) for doc in rollups}
+        days = (next_month - first_day).days
+        return {
+            day: totals.get(day, 0)
+            for day in (first_day.date() + timedelta(days=i) for i in range(days))
+        }
+
+
+class Clock:
+    """Source of the current time for tasks and managers; replace it to pin the time"""
+    def now(self, tz=None):
+        return datetime.now(tz)
+
+
+class FixedClock(Clock):
+    """Clock frozen at one local time (a batch of tasks, benchmarks)"""
+    def __init__(self, moment):
+        self._moment = moment
+
+    def now(self, tz=None):
+        return self._moment.astimezone(tz) if tz else self._moment
+
+
+# Jam bersama; Task.clock dan ToDoListManager.clock dapat diganti, misalnya dengan FixedClock
+system_clock = Clock()
+
+# Zona waktu tampilan, cukup dicari sekali
+JAKARTA = pytz.timezone('Asia/Jakarta')
+DEADLINE_DATE_FORMAT = "%d %b %Y"
 
 
 class Task(ABC):
     """Abstract base class for tasks"""
-    def __init__(self, name, description, priority, deadline, username):
+    # Tanpa __dict__: satu halaman atau impor berisi ribuan objek Task
+    __slots__ = ("_id", "_name", "_description", "_priority", "_deadline", "_username", "_point", "_status", "_type")
+    clock = system_clock
+
+    def __init__(self, name, description, priority, deadline, username, task_id=None, now=None):
+        # _id dibuat di sisi klien agar insert dapat di-retry secara idempoten
+        self._id = task_id or new_id()
         self._name = name
         self._description = description
         self._priority = priority
@@ -213,7 +375,25 @@ class Task(ABC):
         self._username = username
         self._point = self._calculate_point()
         self._status = "ongoing"
-        self._type = self._determine_type()
+        self._type = self._determine_type(now)
+
+    @classmethod
+    def from_document(cls, document, username=None):
+        """Build a task from a stored document without recomputing its point or type
+
+        Fields left out of a projection (e.g. description in the task list) are None.
+        """
+        task = cls.__new__(cls)
+        task._id = document["_id"]
+        task._name = document.get("name")
+        task._description = document.get("description")
+        task._priority = document.get("priority")
+        task._deadline = document.get("deadline")
+        task._username = document.get("username", username)
+        task._point = document.get("point")
+        task._status = document.get("status")
+        task._type = document.get("type")
+        return task
 
     def _calculate_point(self):
         """Calculate points based on priority"""
@@ -225,33 +405,64 @@ class Task(ABC):
         min_point, max_point = priority_points.get(self._priority, (1, 5))
         return randint(min_point, max_point)
 
-    def _determine_type(self):
-        """Determine task type based on deadline"""
-        now = datetime.now()
+    def _determine_type(self, now=None):
+        """Determine task type based on deadline (now can be shared by a batch of tasks)"""
+        now = now or self.clock.now()
         if now > self._deadline:
             return "missed"
         elif (self._deadline - now) <= timedelta(hours=24):
             return "urgent"
         return "common"
 
+    @property
+    def task_id(self):
+        """Getter for task id"""
+        return self._id
+
     @property
     def name(self):
         """Getter for task name"""
         return self._name
 
+    @property
+    def description(self):
+        """Getter for task description"""
+        return self._description
+
+    @property
+    def priority(self):
+        """Getter for task priority"""
+        return self._priority
+
+    @property
+    def deadline(self):
+        """Getter for task deadline"""
+        return self._deadline
+
     @property
     def point(self):
         """Getter for task points"""
         return self._point
 
+    @property
+    def status(self):
+        """Getter for task status"""
+        return self._status
+
+    @property
+    def type(self):
+        """Getter for task type"""
+        return self._type
+
     @property
     def username(self):
         """Getter for username"""
         return self._username
 
-    def get_detailed_info(self):
-        """Get detailed task information"""
+    def to_document(self):
+        """Document stored for this task"""
         return {
+            "_id": self._id,
             "name": self._name,
             "description": self._description,
             "priority": self._priority,
@@ -262,83 +473,299 @@ class Task(ABC):
             "username": self._username
         }
 
+    def get_detailed_info(self):
+        """Get detailed task information"""
+        return self.to_document()
+
+
+def next_occurrence(rule, after):
+    """Deadline of the first occurrence of a recurring rule after `after`, never before its start
+
+    The time of day comes from rule["start"]; "interval" rules repeat every
+    interval_days counted from the start.
+    """
+    start = rule["start"]
+    if after < start:
+        after = start - timedelta(microseconds=1)
+    if rule["frequency"] == "interval":
+        step = timedelta(days=rule["interval_days"])
+        return start + ((after - start) // step + 1) * step
+
+    candidate = datetime.combine(after.date(), start.time())
+    if candidate <= after:
+        candidate += timedelta(days=1)
+    if rule["frequency"] == "weekly":
+        # weekdays berisi nilai datetime.weekday() (Senin = 0)
+        while candidate.weekday() not in rule["weekdays"]:
+            candidate += timedelta(days=1)
+    return candidate
+
+
+def format_deadlines(tasks, tz=JAKARTA):
+    """Localize and format the deadlines of a batch of tasks; return {task_id: (deadline, label)}"""
+    # Deadline tersimpan sebagai waktu lokal tanpa zona waktu. Selisih ke tz hanya berubah
+    # pada pergantian jam (DST), jadi astimezone cukup sekali per jam, bukan per tugas;
+    # begitu pula strftime cukup sekali per tanggal
+    offsets = {}
+    dates = {}
+    formatted = {}
+    for task in tasks:
+        local = task.deadline
+        hour = local.toordinal() * 24 + local.hour
+        offset = offsets.get(hour)
+        if offset is None:
+            start = local.replace(minute=0, second=0, microsecond=0)
+            localized = start.astimezone(tz)
+            offset = offsets[hour] = (localized.replace(tzinfo=None) - start, localized.tzinfo)
+        deadline = (local + offset[0]).replace(tzinfo=offset[1])
+
+        day = deadline.toordinal()
+        date_label = dates.get(day)
+        if date_label is None:
+            date_label = dates[day] = deadline.strftime(DEADLINE_DATE_FORMAT)
+        formatted[task.task_id] = (deadline, f"{date_label} {deadline.hour:02d}:{deadline.minute:02d}")
+    return formatted
+
+
 class ToDoListManager:
     """Manages todo list operations"""
+    # Waktu transisi tipe tugas berikutnya per username (cache tingkat proses)
+    _next_transition = {}
+
+    # Jumlah tugas per halaman di setiap tab
+    PAGE_SIZE = 20
+    TASK_TYPES = ["urgent", "common", "missed"]
+    # Field yang diambil untuk daftar tugas (tanpa deskripsi)
+    HEADER_FIELDS = ["name", "deadline", "priority", "point", "status", "type"]
+    # Field yang diekspor (selain _id)
+    EXPORT_FIELDS = ["name", "description", "priority", "deadline", "point", "status", "type"]
+    # Pilihan urutan hasil pencarian: (field, arah)
+    SORT_OPTIONS = {
+        "deadline": ("deadline", 1),
+        "deadline_desc": ("deadline", -1),
+        "point_desc": ("point", -1),
+        "point": ("point", 1),
+        "name": ("name", 1),
+    }
+    # Field yang ditampilkan di halaman arsip
+    ARCHIVE_FIELDS = ["name", "deadline", "priority", "point", "archived_at"]
+    # Jenis pengulangan tugas berulang
+    RECURRENCE_FREQUENCIES = ["daily", "weekly", "interval"]
+    clock = system_clock
+
     def __init__(self, username):
-        self._db_connection = DatabaseConnection()
-        self._tasks_collection = self._db_connection.tasks_collection
+        repositories = Repositories()
+        self._tasks = repositories.tasks
+        self._rules = repositories.rules
         self._username = username
-        self._user_manager = UserManager()
+        self._user_manager = get_user_manager()
+
+    @property
+    def username(self):
+        """Getter for the owner of the managed tasks"""
+        return self._username
 
     def add_task(self, task):
         """Add a task for the current user"""
         task_data = task.get_detailed_info()
-        self._tasks_collection.insert_one(task_data)
-
-    def mark_task_done(self, task_name):
-        """Mark a task as done and update points"""
-        task = self._tasks_collection.find_one({
-            "name": task_name, 
-            "username": self._username
-        })
-        
-        if task and task['type'] != "missed":
+        if not self._tasks.insert(task_data):
+            # Tugas dengan _id ini sudah tersimpan (retry dari insert sebelumnya)
+            logging.info(f"Task {task.task_id} already exists, skipping insert.")
+        self._invalidate_next_transition()
+        self._written()
+
+    def add_tasks(self, tasks):
+        """Add a batch of tasks for the current user; return the number inserted"""
+        inserted = self._tasks.insert_many([task.get_detailed_info() for task in tasks])
+        self._invalidate_next_transition()
+        self._written()
+        return inserted
+
+    def iter_tasks(self, batch_size=1000):
+        """Yield every task of the current user without loading them all at once"""
+        return self._tasks.iter_tasks(self._username, ["_id"] + self.EXPORT_FIELDS, batch_size)
+
+    def mark_task_done(self, task_id):
+        """Mark a task as done and update points; return the removed task"""
+        # Hapus dan ambil tugas dalam satu operasi, sehingga retry tidak menambah poin dua kali
+        document = self._tasks.delete_and_return(self._username, task_id)
+        if not document:
+            return None
+        self._advance_finished_rules([task_id])
+        self._written()
+
+        task = Task.from_document(document, self._username)
+        if task.type != "missed":
             # Add points for completing the task
-            self._user_manager.add_daily_points(task['point'],self._username)
-            
-            # Remove the task
-            self._tasks_collection.delete_one({
-                "name": task_name, 
-                "username": self._username
-            })
-            st.success(f"Tugas '{task_name}' selesai.")
-        else:
-            self._tasks_collection.delete_one({
-                "name": task_name, 
-                "username": self._username
-            })
-            st.success(f"Tugas Missed '{task_name}' selesai.")
+            self._user_manager.add_daily_points(task.point, self._username, [task.name])
+        return task
             
+    def complete_tasks(self, task_ids):
+        """Mark several tasks as done with one bulk write and one point update"""
+        # Hanya tugas yang benar-benar dihapus oleh panggilan ini yang diberi poin,
+        # sehingga klik ganda atau dua tab tidak menambah poin dua kali
+        tasks = [
+            Task.from_document(document, self._username)
+            for document in self._tasks.delete_and_return_many(
+                self._username, task_ids, ["name", "point", "type"]
+            )
+        ]
+        if not tasks:
+            return 0, 0
+
+        deleted_count = len(tasks)
+        self._advance_finished_rules([task.task_id for task in tasks])
+        self._written()
+
+        # Semua tugas selesai hari ini, jadi poin cukup ditambahkan dalam satu $inc
+        awarded = [task for task in tasks if task.type != "missed"]
+        total_points = sum(task.point for task in awarded)
+        if total_points:
+            self._user_manager.add_daily_points(
+                total_points, self._username, [task.name for task in awarded]
+            )
+        return deleted_count, total_points
+
+    def delete_tasks(self, task_ids):
+        """Delete several tasks with one bulk write"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return 0
+        deleted_count = self._tasks.delete_by_ids(self._username, task_ids)
+        self._advance_finished_rules(task_ids)
+        self._written()
+        return deleted_count
+
+    def add_recurring_task(self, name, description, priority, frequency, start, weekdays=(), interval_days=1):
+        """Store a recurring task rule and create its first occurrence; return the rule
+
+        frequency is "daily", "weekly" (on weekdays, Monday = 0) or "interval"
+        (every interval_days days); start is the first possible deadline.
+        """
+        if frequency not in self.RECURRENCE_FREQUENCIES:
+            raise ValueError(f"Unknown recurrence frequency '{frequency}'")
+        if frequency == "weekly" and not weekdays:
+            raise ValueError("Weekly recurrence needs at least one weekday")
+        if frequency == "interval" and interval_days < 1:
+            raise ValueError("Recurrence interval must be at least one day")
+
+        rule = {
+            "_id": new_id(),
+            "username": self._username,
+            "name": name,
+            "description": description,
+            "priority": priority,
+            "frequency": frequency,
+            "weekdays": sorted(set(weekdays)),
+            "interval_days": interval_days,
+            "start": start,
+        }
+        # Hanya okurensi berikutnya yang dibuat; yang setelahnya menyusul saat okurensi ini selesai
+        now = self.clock.now()
+        deadline = next_occurrence(rule, now)
+        task = self._new_occurrence(rule, deadline, now)
+        rule["task_id"], rule["deadline"] = task.task_id, deadline
+        self._rules.insert(rule)
+        self._tasks.insert(task.to_document())
+        self._invalidate_next_transition()
+        self._written()
+        return rule
+
+    def load_recurring_tasks(self):
+        """Fetch the recurring task rules of the current user, next occurrence first"""
+        return self._rules.find_by_username(self._username)
+
+    def delete_recurring_task(self, rule_id):
+        """Stop a recurring task; its current occurrence stays as a normal task"""
+        return self._rules.delete(self._username, rule_id)
+
+    def _new_occurrence(self, rule, deadline, now):
+        """Task for one occurrence of a rule; point and type come from Task as for any other task"""
+        return Task(rule["name"], rule["description"], rule["priority"], deadline, self._username, now=now)
+
+    def _advance_rules(self, rules, now):
+        """Create the next occurrence of each rule; return the number created"""
+        created = 0
+        for rule in rules:
+            # Selesai lebih awal tidak memajukan jadwal: okurensi berikutnya tetap setelah deadline lama
+            deadline = next_occurrence(rule, max(now, rule["deadline"]))
+            task = self._new_occurrence(rule, deadline, now)
+            # Aturan dipindahkan dulu (compare-and-set), sehingga sesi lain yang memproses
+            # okurensi yang sama tidak membuat okurensi kedua
+            if self._rules.advance(rule["_id"], rule["task_id"], task.task_id, deadline):
+                self._tasks.insert(task.to_document())
+                created += 1
+        if created:
+            self._invalidate_next_transition()
+        return created
+
+    def _advance_finished_rules(self, task_ids):
+        """Create the next occurrence of rules whose current occurrence was completed or deleted"""
+        rules = self._rules.find_by_task_ids(self._username, task_ids)
+        if rules:
+            self._advance_rules(rules, self.clock.now())
+
     def update_task_types(self):
-        """Update task types based on current time"""
-        current_time = datetime.now()
-        
+        """Update task types of the current user based on current time"""
+        current_time = self.clock.now()
+
+        # Lewati jika belum ada tugas yang melewati batas transisi berikutnya
+        next_transition = self._next_transition.get(self._username)
+        if next_transition is not None and current_time < next_transition:
+            return
+
         # Update tasks to missed if deadline has passed
-        self._tasks_collection.update_many(
-            {
-                "deadline": {"$lt": current_time},
-                "type": {"$ne": "missed"}
-            },
-            {
-                "$set": {
-                    "type": "missed",
-                    "status": "missed"
-                }
-            }
-        )
-        
+        self._tasks.mark_missed(self._username, current_time)
+
         # Update tasks to urgent if within 24 hours
-        self._tasks_collection.update_many(
-            {
-                "deadline": {
-                    "$gt": current_time,
-                    "$lt": current_time + timedelta(hours=24)
-                },
-                "type": "common"
-            },
-            {
-                "$set": {
-                    "type": "urgent"
-                }
-            }
-        )
+        self._tasks.mark_urgent(self._username, current_time, current_time + timedelta(hours=24))
+
+        # Okurensi tugas berulang yang baru saja terlewat diganti dengan okurensi berikutnya
+        self._advance_rules(self._rules.find_due(self._username, current_time), current_time)
+
+        self._next_transition[self._username] = self._compute_next_transition()
+        self._written()
+
+    def _compute_next_transition(self):
+        """Earliest time at which one of the user's tasks changes type"""
+        boundaries = []
+        # Tugas urgent berubah menjadi missed saat deadline tercapai
+        urgent_deadline = self._tasks.earliest_deadline(self._username, "urgent")
+        if urgent_deadline:
+            boundaries.append(urgent_deadline)
+
+        # Tugas common berubah menjadi urgent 24 jam sebelum deadline
+        common_deadline = self._tasks.earliest_deadline(self._username, "common")
+        if common_deadline:
+            boundaries.append(common_deadline - timedelta(hours=24))
+
+        return min(boundaries) if boundaries else datetime.max
+
+    def _written(self):
+        """Drop the user's cached data and bump its version after a write made by this process"""
+        query_cache.invalidate(self._username)
+        data_versions.bump([self._username])
+
+    def _invalidate_next_transition(self):
+        """Force the next update_task_types call to recompute transitions"""
+        self._next_transition.pop(self._username, None)
+
+    @classmethod
+    def invalidate_user(cls, username=None):
+        """Drop cached pages and transition times of a user changed elsewhere (all users if None)"""
+        if username is None:
+            cls._next_transition.clear()
+            query_cache.clear()
+        else:
+            cls._next_transition.pop(username, None)
+            query_cache.invalidate(username)
         
     from datetime import datetime, date
 
-    def update_task_deadline(self, task_name, new_deadline):
-        """Update deadline and type for a task"""
+    def update_task_deadline(self, task_id, new_deadline):
+        """Update deadline and type for a task; return the new type, or None on failure"""
         # Ambil waktu saat ini
-        now = datetime.now()
+        now = self.clock.now()
 
         # Tentukan tipe tugas berdasarkan deadline
         if (new_deadline - now).days <= 1:
@@ -347,119 +774,99 @@ class ToDoListManager:
             new_type = "common"
 
         # Perbarui deadline dan tipe tugas di database
-        result = self._tasks_collection.update_one(
-            {"name": task_name, "username": self._username},
-            {"$set": {"deadline": new_deadline, "type": new_type, "status": "ongoing"}}
+        task_name = self._tasks.update_deadline(self._username, task_id, new_deadline, new_type)
+        self._invalidate_next_transition()
+        self._written()
+        return new_type if task_name else None
+
+    def delete_task(self, task_id):
+        """Delete a task from the database"""
+        self._tasks.delete(self._username, task_id)
+        self._advance_finished_rules([task_id])
+        self._written()
+
+    def load_task_pages(self, cursors=None, page_size=None):
+        """Fetch one page of Task headers per type (cached per user)"""
+        cursors = cursors or {}
+        page_size = page_size or self.PAGE_SIZE
+        return query_cache.get_or_set(
+            self._username,
+            ("task_pages", tuple(sorted(cursors.items())), page_size),
+            lambda: self._load_task_pages(cursors, page_size)
         )
 
-        # Berikan umpan balik ke pengguna
-        if result.modified_count > 0:
-            st.success(f"Deadline untuk '{task_name}' berhasil diperbarui ke {new_deadline}, dan tipe tugas diubah menjadi '{new_type}'.")
-        else:
-            st.error(f"Gagal memperbarui deadline untuk '{task_name}'.")
+    def _load_task_pages(self, cursors, page_size):
+        """Fetch one page of task headers per type in a single round trip"""
+        # Deskripsi tidak ikut diambil, hanya field yang tampil di header
+        results, counts = self._tasks.load_pages(
+            self._username, self.TASK_TYPES, cursors, page_size, self.HEADER_FIELDS
+        )
+        pages = {}
+        for task_type in self.TASK_TYPES:
+            documents = results[task_type]
+            has_next = len(documents) > page_size
+            tasks = [Task.from_document(document, self._username) for document in documents[:page_size]]
+            pages[task_type] = {
+                "tasks": tasks,
+                "count": counts.get(task_type, 0),
+                "next_cursor": (tasks[-1].deadline, tasks[-1].task_id) if has_next else None
+            }
+        return pages
+
+    def search_tasks(self, text="", priorities=(), deadline_from=None, deadline_to=None,
+                     min_point=None, max_point=None, sort="deadline", cursor=None, page_size=None):
+        """Fetch one page of task headers matching the filters (cached per user)"""
+        filters = {
+            "terms": tuple(text.replace('"', " ").split()),
+            "priorities": tuple(priorities),
+            "deadline_from": deadline_from,
+            "deadline_to": deadline_to,
+            "min_point": min_point,
+            "max_point": max_point,
+        }
+        page_size = page_size or self.PAGE_SIZE
+        return query_cache.get_or_set(
+            self._username,
+            ("search", tuple(filters.items()), sort, cursor, page_size),
+            lambda: self._search_tasks(filters, sort, cursor, page_size)
+        )
 
-    def delete_task(self, task_name):
-        """Delete a task from the database"""
-        self._tasks_collection.delete_one({"name": task_name, "username": self._username})
-
-    def display_tasks(self):
-        """Display tasks for the current user with updated types using tabs"""
-        # Update task types before displaying
-        self.update_task_types()
-
-        # Jenis tugas yang akan ditampilkan
-        task_types = ["urgent", "common", "missed"]
-        tab_labels = ["Tugas Urgent", "Tugas Common", "Tugas Missed"]  # Label tab
-        total_tasks = 0
-
-        # Membuat tabs untuk setiap kategori tugas
-        tabs = st.tabs(tab_labels)
-
-        for task_type, tab in zip(task_types, tabs):
-            with tab:
-                # Cari tugas berdasarkan jenis dan username
-                tasks = self._tasks_collection.find({
-                    "type": task_type,
-                    "username": self._username
-                })
-
-                st.subheader(f"{task_type.capitalize()} Tasks", anchor=False)
-                found = False
-
-                # Iterasi untuk menampilkan tugas
-                for task in tasks:
-                    found = True
-                    total_tasks += 1
-
-                    # Format deadline
-                    deadline = task['deadline'].astimezone(pytz.timezone('Asia/Jakarta'))
-                    deadline_str = deadline.strftime("%d %b %Y %H:%M")
-
-                    # Tampilkan informasi tugas
-                    with st.expander(f"**{task['name']}**"):
-                        st.markdown(f"""
-                        **Nama**     : {task['name']}  
-                        **Deskripsi**: {task['description']}  
-                        **Deadline** : {deadline_str}  
-                        **Status**   : {task['status']}  
-                        **Prioritas**: {task['priority']}  
-                        **Point**    : {task['point']}
-                        """)
-
-                        # Tombol berdasarkan tipe tugas
-                        if task_type != "missed":
-                            if task_type == "urgent":
-                                st.markdown("---")
-                                deadline_display = st.empty()  # Create an empty container to update every second
-                                now = datetime.now(pytz.timezone('Asia/Jakarta'))
-                                time_left = deadline - now
-                                if time_left.total_seconds() <= 0:
-                                    deadline_display.markdown("**Deadline has passed!**")
-                                    break
- 
-                                countdown_str = f"{str(time_left).split('.')[0]}"  # HH:MM:SS format
-                                deadline_display.markdown(f"**Waktu Tersisa**: {countdown_str}")
-                                # Tombol untuk menyelesaikan tugas
-                            if st.button(f"Selesaikan {task['name']}", key=f"complete-{task['name']}", type="primary"):
-                                self.mark_task_done(task['name'])
-                                time.sleep(1)
-                                st.rerun()
-
-                        else:
-                            # Tombol untuk update deadline
-                            task_deadline = st.date_input("Tanggal Deadline", key=f"date-input-{task['name']}")
-                            deadline_time = st.time_input("Waktu Deadline", value=None, key=f"time-input-{task['name']}") 
-                            # Kombinasikan tanggal dan waktu untuk mendapatkan deadline dalam datetime
-                            
-                            # Periksa apakah deadline lebih kecil dari waktu sekarang
-                            if st.button(f"Perbarui Deadline {task['name']}", key=f"update-deadline-{task['name']}"):
-                                if task_deadline and deadline_time:
-                                    new_deadline = datetime.combine(task_deadline, deadline_time)
-                                    
-                                    # Ambil waktu sekarang
-                                    now = datetime.now()
-                                    if new_deadline < now:
-                                        st.warning("Deadline tidak boleh kurang dari waktu saat ini. Harap pilih deadline yang valid.")
-                                    else: 
-                                        self.update_task_deadline(task['name'], new_deadline)
-                                        time.sleep(3)
-                                        st.rerun()
-                                else:
-                                    st.warning("Harap isi semua untuk melakukan update.")
-
-                            # Tombol untuk menghapus tugas
-                            if st.button(f"Hapus Tugas {task['name']}", key=f"delete-{task['name']}", type="primary"):
-                                self.delete_task(task['name'])
-                                st.warning(f"Tugas '{task['name']}' telah dihapus.")
-                                time.sleep(2)
-                                st.rerun()
-
-                    st.markdown("---")
-
-                if not found:
-                    st.info(f"Tidak ada tugas untuk kategori {task_type.capitalize()}.")
-                    st.markdown("---")
-
-        # Pesan jika semua tugas selesai
-        if total_tasks == 0:
-            st.success("Tidak ada tugas yang perlu dikerjakan! 🎉")
+    def _search_tasks(self, filters, sort, cursor, page_size):
+        """Run a search query and split off the next-page cursor"""
+        field, direction = self.SORT_OPTIONS[sort]
+        documents = self._tasks.search(
+            self._username, filters, (field, direction), cursor, page_size, self.HEADER_FIELDS
+        )
+        has_next = len(documents) > page_size
+        tasks = [Task.from_document(document, self._username) for document in documents[:page_size]]
+        return {
+            "tasks": tasks,
+            "next_cursor": (getattr(tasks[-1], field), tasks[-1].task_id) if has_next else None
+        }
+
+    def load_archive_page(self, cursor=None, page_size=None):
+        """Fetch one page of archived tasks, most recently archived first (not cached)"""
+        page_size = page_size or self.PAGE_SIZE
+        tasks = self._tasks.load_archive(self._username, cursor, page_size, self.ARCHIVE_FIELDS)
+        has_next = len(tasks) > page_size
+        tasks = tasks[:page_size]
+        return {
+            "tasks": tasks,
+            "next_cursor": (tasks[-1]["archived_at"], tasks[-1]["_id"]) if has_next else None
+        }
+
+    def get_task_description(self, task_id):
+        """Fetch the description of a single task"""
+        return self._tasks.find_description(self._username, task_id)
+
+
+def get_user_manager():
+    """Return the process-wide UserManager"""
+    return manager_cache.get_or_set(None, ("user_manager",), UserManager)
+
+
+def get_todo_manager(username):
+    """Return the process-wide ToDoListManager of a user"""
+    return manager_cache.get_or_set(
+        None, ("todo_manager", username), lambda: ToDoListManager(username)
+    )
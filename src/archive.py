@@ -0,0 +1,82 @@
+"""Retention of missed tasks: move old ones to the archive and purge the archive.
+
+    python src/archive.py
+
+runs the job once (e.g. from cron). Inside the Streamlit app the same job
+runs on a daemon thread every TODO_ARCHIVE_RUN_INTERVAL_MINUTES; set it to
+0 to leave retention to the command line.
+"""
+import logging
+import threading
+import time
+import pytz
+from datetime import datetime, timedelta
+from Class import Repositories, query_cache
+from storage import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_TTL_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_BATCH_INTERVAL, ARCHIVE_RUN_INTERVAL
+)
+
+
+def archive_missed_tasks(max_batches=None):
+    """Move tasks whose deadline passed more than ARCHIVE_AFTER_DAYS ago to the archive; return the number moved"""
+    tasks = Repositories().tasks
+    # Deadline disimpan sebagai waktu lokal tanpa zona waktu, seperti di update_task_types
+    deadline_before = datetime.now() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    archived_at = datetime.now(pytz.utc)
+
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        usernames = tasks.archive_missed(deadline_before, archived_at, ARCHIVE_BATCH_SIZE)
+        for username in set(usernames):
+            query_cache.invalidate(username)
+        archived += len(usernames)
+        batches += 1
+        if len(usernames) < ARCHIVE_BATCH_SIZE:
+            break
+        # Jeda antar batch membatasi laju tulis ke database
+        time.sleep(ARCHIVE_BATCH_INTERVAL)
+    return archived
+
+
+def purge_archive():
+    """Delete archived tasks older than ARCHIVE_TTL_DAYS; return the number deleted"""
+    archived_before = datetime.now(pytz.utc) - timedelta(days=ARCHIVE_TTL_DAYS)
+    return Repositories().tasks.purge_archive(archived_before)
+
+
+def run_retention():
+    """Archive old missed tasks, then purge the archive"""
+    archived = archive_missed_tasks()
+    purged = purge_archive()
+    logging.info(f"Archived {archived} missed tasks, purged {purged} archived tasks.")
+    return archived, purged
+
+
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def _worker_loop():
+    while True:
+        try:
+            run_retention()
+        except Exception:
+            logging.exception("Task retention job failed")
+        time.sleep(ARCHIVE_RUN_INTERVAL)
+
+
+def start_archive_worker():
+    """Start the retention job on a daemon thread, once per process"""
+    global _worker
+    if ARCHIVE_RUN_INTERVAL <= 0:
+        return
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_worker_loop, name="todo-archive", daemon=True)
+            _worker.start()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_retention()
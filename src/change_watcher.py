@@ -0,0 +1,108 @@
+"""Cross-session cache invalidation.
+
+One watcher thread per process listens to a MongoDB change stream on
+tasks and users, or polls per-user task fingerprints when change streams
+are unavailable (standalone MongoDB, SQLite). Every change drops the
+cached data of the affected user and bumps its version in
+Class.data_versions, which open sessions compare against to rerun (see
+components/live_refresh.py). Writes made in this process bump the version
+themselves, so other sessions of the same user refresh without waiting
+for the watcher.
+"""
+import logging
+import threading
+import time
+from Class import Repositories, ToDoListManager, UserManager, data_versions
+from storage import CHANGE_WATCH, CHANGE_POLL_INTERVAL
+
+# Pengguna tanpa sesi aktif selama ini tidak lagi dipantau oleh polling
+ACTIVE_USER_TIMEOUT = 600
+# Jeda sebelum membuka ulang change stream yang terputus
+RECONNECT_DELAY = 5
+
+
+class ChangeWatcher:
+    """Per-process listener that invalidates the caches of users changed elsewhere"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_seen = {}
+        self._thread = None
+        self.mode = None
+
+    def track(self, username):
+        """Mark a user as having an open session in this process"""
+        with self._lock:
+            self._last_seen[username] = time.monotonic()
+
+    def version(self, username):
+        """Counter that increases whenever the user's data changed"""
+        return data_versions.version(username)
+
+    def _active_usernames(self):
+        now = time.monotonic()
+        with self._lock:
+            for username, seen in list(self._last_seen.items()):
+                if now - seen > ACTIVE_USER_TIMEOUT:
+                    del self._last_seen[username]
+            return list(self._last_seen)
+
+    def _changed(self, username):
+        """Invalidate one user, or every user when the change cannot be attributed"""
+        ToDoListManager.invalidate_user(username)
+        # Tugas yang diselesaikan di proses lain dapat mengubah poin mingguan
+        UserManager.invalidate_leaderboard()
+        if username is not None:
+            data_versions.bump([username])
+        else:
+            with self._lock:
+                active = list(self._last_seen)
+            data_versions.bump(data_versions.usernames() + active)
+
+    def start(self):
+        """Start the watcher thread once"""
+        if CHANGE_WATCH == "off":
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="todo-change-watcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        tasks = Repositories().tasks
+        while CHANGE_WATCH == "auto":
+            try:
+                self.mode = "change_stream"
+                for username in tasks.watch_changes():
+                    self._changed(username)
+            except NotImplementedError as e:
+                logging.info(f"Change streams unavailable, falling back to polling: {e}")
+                break
+            except Exception:
+                logging.exception("Change stream interrupted, reopening")
+                time.sleep(RECONNECT_DELAY)
+            # Event selama stream terputus tidak diketahui: anggap semua pengguna berubah
+            self._changed(None)
+        self.mode = "poll"
+        self._poll(tasks)
+
+    def _poll(self, tasks):
+        """Compare the task fingerprints of active users every CHANGE_POLL_INTERVAL seconds"""
+        previous = {}
+        while True:
+            time.sleep(CHANGE_POLL_INTERVAL)
+            usernames = self._active_usernames()
+            if not usernames:
+                previous = {}
+                continue
+            try:
+                current = tasks.fingerprints(usernames)
+            except Exception:
+                logging.exception("Polling task fingerprints failed")
+                continue
+            for username in usernames:
+                if username in previous and previous[username] != current.get(username):
+                    self._changed(username)
+            previous = {username: current.get(username) for username in usernames}
+
+
+change_watcher = ChangeWatcher()
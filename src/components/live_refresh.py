@@ -0,0 +1,28 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from Class import data_versions
+from change_watcher import change_watcher
+from storage import CHANGE_REFRESH_INTERVAL
+
+
+def _session_id():
+    """Streamlit session of the running script, or None outside a session (watcher thread)"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+# Setiap bump dari penulisan di sesi ini dicatat dengan id sesinya
+data_versions.writer_id = _session_id
+
+
+@st.fragment(run_every=CHANGE_REFRESH_INTERVAL)
+def watch_for_changes(username):
+    """Rerun the page when the user's data was changed by another session or process"""
+    # Hanya membandingkan angka di memori; query baru dijalankan setelah rerun
+    version = change_watcher.version(username)
+    seen = st.session_state.setdefault("data-version", version)
+    if seen != version:
+        st.session_state["data-version"] = version
+        # Perubahan yang hanya berasal dari penulisan sesi ini sudah tampil; tidak perlu rerun
+        if not data_versions.written_only_by(username, _session_id(), seen):
+            st.rerun()
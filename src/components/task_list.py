@@ -0,0 +1,265 @@
+import streamlit as st
+from datetime import datetime
+from Class import JAKARTA, format_deadlines
+
+
+def _display_pagination(todo_manager, task_type, page, cursor_stack):
+    """Display previous/next buttons for a task tab"""
+    if not cursor_stack and page["next_cursor"] is None:
+        return
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    if col_prev.button("Sebelumnya", key=f"page-prev-{task_type}", disabled=not cursor_stack):
+        cursor_stack.pop()
+        st.rerun()
+    col_info.caption(f"Halaman {len(cursor_stack) + 1} dari {-(-page['count'] // todo_manager.PAGE_SIZE)}")
+    if col_next.button("Berikutnya", key=f"page-next-{task_type}", disabled=page["next_cursor"] is None):
+        cursor_stack.append(page["next_cursor"])
+        st.rerun()
+
+
+def _display_bulk_actions(todo_manager, task_type, tasks):
+    """Display multi-select controls to complete or delete tasks at once"""
+    task_names = {task.task_id: task.name for task in tasks}
+    selected_ids = st.multiselect(
+        "Pilih Tugas",
+        options=list(task_names),
+        format_func=lambda task_id: task_names[task_id],
+        key=f"bulk-select-{task_type}"
+    )
+    if not selected_ids:
+        return
+
+    if task_type != "missed":
+        if st.button(f"Selesaikan {len(selected_ids)} Tugas", key=f"bulk-complete-{task_type}", type="primary"):
+            completed, points = todo_manager.complete_tasks(selected_ids)
+            st.toast(f"{completed} tugas selesai, {points} poin ditambahkan.")
+            st.rerun()
+    else:
+        if st.button(f"Hapus {len(selected_ids)} Tugas", key=f"bulk-delete-{task_type}", type="primary"):
+            deleted = todo_manager.delete_tasks(selected_ids)
+            st.toast(f"{deleted} tugas telah dihapus.")
+            st.rerun()
+    st.markdown("---")
+
+
+@st.fragment(run_every=1)
+def _display_countdown(deadline):
+    """Display the remaining time of an urgent task, refreshed every second"""
+    time_left = deadline - datetime.now(JAKARTA)
+    if time_left.total_seconds() <= 0:
+        st.markdown("**Deadline has passed!**")
+    else:
+        countdown_str = f"{str(time_left).split('.')[0]}"  # HH:MM:SS format
+        st.markdown(f"**Waktu Tersisa**: {countdown_str}")
+
+
+@st.fragment
+def _display_task_card(todo_manager, task, task_type, deadline, deadline_str):
+    """Display a single task card; its actions only rerun this card
+
+    deadline and deadline_str come from format_deadlines, computed once per page.
+    """
+    # Kartu yang sudah diproses hanya menampilkan ringkasan sampai halaman dibangun ulang
+    # (lihat _reset_card_state)
+    resolved_key = f"task-resolved-{task.task_id}"
+    if resolved_key in st.session_state:
+        # Umpan balik dari callback ditampilkan di sini, bukan di dalam callback
+        toast = st.session_state.pop(f"task-toast-{task.task_id}", None)
+        if toast:
+            st.toast(toast)
+        st.caption(st.session_state[resolved_key])
+        return
+
+    # Tampilkan informasi tugas
+    with st.expander(f"**{task.name}** · {deadline_str}"):
+        st.markdown(f"""
+        **Nama**     : {task.name}  
+        **Deadline** : {deadline_str}  
+        **Status**   : {task.status}  
+        **Prioritas**: {task.priority}  
+        **Point**    : {task.point}
+        """)
+
+        # Deskripsi hanya diambil saat pengguna membukanya
+        if st.toggle("Tampilkan Deskripsi", key=f"show-description-{task.task_id}"):
+            st.markdown(f"**Deskripsi**: {todo_manager.get_task_description(task.task_id)}")
+
+        # Tombol berdasarkan tipe tugas
+        if task_type != "missed":
+            if task_type == "urgent":
+                st.markdown("---")
+                _display_countdown(deadline)
+            # Tombol untuk menyelesaikan tugas
+            st.button(
+                f"Selesaikan {task.name}", key=f"complete-{task.task_id}", type="primary",
+                on_click=_complete_task_action, args=(todo_manager, task)
+            )
+
+        else:
+            # Tombol untuk update deadline
+            st.date_input("Tanggal Deadline", key=f"date-input-{task.task_id}")
+            st.time_input("Waktu Deadline", value=None, key=f"time-input-{task.task_id}") 
+
+            warning = st.session_state.pop(f"task-warning-{task.task_id}", None)
+            if warning:
+                st.warning(warning)
+            st.button(
+                f"Perbarui Deadline {task.name}", key=f"update-deadline-{task.task_id}",
+                on_click=_update_deadline_action, args=(todo_manager, task)
+            )
+
+            # Tombol untuk menghapus tugas
+            st.button(
+                f"Hapus Tugas {task.name}", key=f"delete-{task.task_id}", type="primary",
+                on_click=_delete_task_action, args=(todo_manager, task)
+            )
+
+
+# Aksi kartu dijalankan sebagai callback sebelum kartu digambar ulang,
+# sehingga kartu langsung menampilkan ringkasan tanpa st.rerun()
+def _complete_task_action(todo_manager, task):
+    """Button callback: complete a task and collapse its card"""
+    done = todo_manager.mark_task_done(task.task_id)
+    if done and done.type == "missed":
+        st.session_state[f"task-toast-{task.task_id}"] = f"Tugas Missed '{task.name}' selesai."
+    elif done:
+        st.session_state[f"task-toast-{task.task_id}"] = f"Tugas '{task.name}' selesai."
+    st.session_state[f"task-resolved-{task.task_id}"] = f"✅ {task.name} selesai."
+
+
+def _update_deadline_action(todo_manager, task):
+    """Button callback: validate the new deadline and update the task"""
+    task_deadline = st.session_state.get(f"date-input-{task.task_id}")
+    deadline_time = st.session_state.get(f"time-input-{task.task_id}")
+    if not (task_deadline and deadline_time):
+        st.session_state[f"task-warning-{task.task_id}"] = "Harap isi semua untuk melakukan update."
+        return
+
+    # Kombinasikan tanggal dan waktu untuk mendapatkan deadline dalam datetime
+    new_deadline = datetime.combine(task_deadline, deadline_time)
+    # Periksa apakah deadline lebih kecil dari waktu sekarang
+    if new_deadline < datetime.now():
+        st.session_state[f"task-warning-{task.task_id}"] = "Deadline tidak boleh kurang dari waktu saat ini. Harap pilih deadline yang valid."
+        return
+
+    new_type = todo_manager.update_task_deadline(task.task_id, new_deadline)
+    if new_type is None:
+        st.session_state[f"task-warning-{task.task_id}"] = f"Gagal memperbarui deadline untuk '{task.name}'."
+        return
+    st.session_state[f"task-toast-{task.task_id}"] = f"Deadline untuk '{task.name}' berhasil diperbarui ke {new_deadline}, dan tipe tugas diubah menjadi '{new_type}'."
+    st.session_state[f"task-resolved-{task.task_id}"] = f"🕒 Deadline {task.name} diperbarui."
+
+
+def _delete_task_action(todo_manager, task):
+    """Button callback: delete a task and collapse its card"""
+    todo_manager.delete_task(task.task_id)
+    st.session_state[f"task-toast-{task.task_id}"] = f"Tugas '{task.name}' telah dihapus."
+    st.session_state[f"task-resolved-{task.task_id}"] = f"🗑️ {task.name} dihapus."
+
+
+# Status kartu dari callback; hanya berlaku sampai seluruh halaman dibangun ulang
+_CARD_STATE_PREFIXES = ("task-resolved-", "task-toast-", "task-warning-")
+
+
+def _reset_card_state():
+    """Forget card summaries, toasts and warnings of the previous page build
+
+    Card actions only rerun their fragment, so this runs on full reruns only;
+    after that every card is drawn from freshly loaded data again.
+    """
+    for key in [key for key in st.session_state if str(key).startswith(_CARD_STATE_PREFIXES)]:
+        del st.session_state[key]
+
+
+def display_tasks(todo_manager):
+    """Display tasks for the current user with updated types using tabs"""
+    _reset_card_state()
+
+    # Update task types before displaying
+    todo_manager.update_task_types()
+
+    # Posisi halaman tiap tab disimpan sebagai tumpukan cursor keyset
+    cursor_stacks = {
+        task_type: st.session_state.setdefault(f"task-page-cursors-{task_type}", [])
+        for task_type in todo_manager.TASK_TYPES
+    }
+
+    # Ambil satu halaman untuk setiap jenis tugas sekaligus
+    pages = todo_manager.load_task_pages(
+        {task_type: stack[-1] for task_type, stack in cursor_stacks.items() if stack}
+    )
+
+    # Jenis tugas yang akan ditampilkan
+    task_types = todo_manager.TASK_TYPES
+    tab_labels = [f"Tugas {task_type.capitalize()} ({pages[task_type]['count']})" for task_type in task_types]  # Label tab
+    total_tasks = 0
+
+    # Mode pilih banyak untuk menyelesaikan atau menghapus beberapa tugas sekaligus
+    multi_select = st.toggle("Mode Pilih Banyak", key="multi-select-mode")
+
+    # Membuat tabs untuk setiap kategori tugas
+    tabs = st.tabs(tab_labels)
+
+    for task_type, tab in zip(task_types, tabs):
+        with tab:
+            tasks = pages[task_type]["tasks"]
+
+            st.subheader(f"{task_type.capitalize()} Tasks", anchor=False)
+            found = False
+
+            if multi_select and tasks:
+                _display_bulk_actions(todo_manager, task_type, tasks)
+
+            # Deadline satu halaman dikonversi dan diformat sekaligus
+            deadlines = format_deadlines(tasks)
+
+            # Iterasi untuk menampilkan tugas
+            for task in tasks:
+                found = True
+                total_tasks += 1
+
+                _display_task_card(todo_manager, task, task_type, *deadlines[task.task_id])
+                st.markdown("---")
+
+            if not found:
+                st.info(f"Tidak ada tugas untuk kategori {task_type.capitalize()}.")
+                st.markdown("---")
+
+            _display_pagination(todo_manager, task_type, pages[task_type], cursor_stacks[task_type])
+
+    # Pesan jika semua tugas selesai
+    if total_tasks == 0:
+        st.success("Tidak ada tugas yang perlu dikerjakan! 🎉")
+
+
+def display_search_results(todo_manager, search):
+    """Display one page of tasks matching search (keyword arguments of search_tasks)"""
+    _reset_card_state()
+    todo_manager.update_task_types()
+
+    # Pencarian yang berubah dimulai lagi dari halaman pertama
+    search_key = repr(sorted(search.items()))
+    if st.session_state.get("search-key") != search_key:
+        st.session_state["search-key"] = search_key
+        st.session_state["search-cursors"] = []
+    cursor_stack = st.session_state["search-cursors"]
+
+    page = todo_manager.search_tasks(**search, cursor=cursor_stack[-1] if cursor_stack else None)
+    if not page["tasks"]:
+        st.info("Tidak ada tugas yang cocok dengan pencarian.")
+
+    deadlines = format_deadlines(page["tasks"])
+    for task in page["tasks"]:
+        _display_task_card(todo_manager, task, task.type, *deadlines[task.task_id])
+        st.markdown("---")
+
+    if not cursor_stack and page["next_cursor"] is None:
+        return
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    if col_prev.button("Sebelumnya", key="search-prev", disabled=not cursor_stack):
+        cursor_stack.pop()
+        st.rerun()
+    col_info.caption(f"Halaman {len(cursor_stack) + 1}")
+    if col_next.button("Berikutnya", key="search-next", disabled=page["next_cursor"] is None):
+        cursor_stack.append(page["next_cursor"])
+        st.rerun()
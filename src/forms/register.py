@@ -1,8 +1,7 @@
 import streamlit as st
-import time
 from Class import *
     
-user_manager = UserManager()
+user_manager = get_user_manager()
 
 @st.dialog("Sign Up")
 def register():
@@ -20,9 +19,8 @@ def register():
                 # Simulasi proses registrasi
                 success, message = user_manager.register(new_username, new_password)
                 if success:
-                    st.success(message)
+                    st.toast(message)
+                    st.rerun()
                 else:
                     st.error(message)
-            time.sleep(1)
-            st.rerun()
             
\ No newline at end of file
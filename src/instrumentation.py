@@ -0,0 +1,242 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar, copy_context
+from types import GeneratorType
+
+
+# Instrumentasi aktif hanya jika TODO_INSTRUMENTATION=1; jika tidak, repository tidak dibungkus sama sekali
+INSTRUMENTATION_ENABLED = os.environ.get("TODO_INSTRUMENTATION", "0") == "1"
+# Username yang boleh membuka halaman metrik (dipisah koma)
+ADMIN_USERS = {user for user in os.environ.get("TODO_ADMIN_USERS", "").split(",") if user}
+
+# Batas atas bucket histogram latensi (detik)
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+_VIEWS_DIR = os.path.join(_SRC_DIR, "views")
+
+# Halaman pemanggil yang dibawa ke thread lain (lihat page_context)
+_page = ContextVar("page", default=None)
+
+
+class OperationStats:
+    """Latency histogram and document counters of one operation"""
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.documents = 0
+        self.pages = {}
+
+    def record(self, seconds, documents, page):
+        self.bucket_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.documents += documents
+        self.pages[page] = self.pages.get(page, 0) + 1
+
+
+class Metrics:
+    """In-process histograms of storage operations"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations = {}
+
+    def record(self, operation, seconds, documents, page, failed=False):
+        """Record one call of an operation"""
+        with self._lock:
+            stats = self._operations.setdefault(operation, OperationStats())
+            if failed:
+                stats.errors += 1
+            else:
+                stats.record(seconds, documents, page)
+
+    def snapshot(self):
+        """Return a summary row per operation, slowest total time first"""
+        with self._lock:
+            rows = [
+                {
+                    "operation": operation,
+                    "calls": stats.count,
+                    "errors": stats.errors,
+                    "mean_ms": round(stats.total_seconds / stats.count * 1000, 3) if stats.count else 0.0,
+                    "p95_ms": self._bucket_percentile(stats, 0.95) * 1000,
+                    "documents": stats.documents,
+                    "pages": dict(stats.pages),
+                    "total_seconds": stats.total_seconds,
+                }
+                for operation, stats in self._operations.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_seconds"], reverse=True)
+
+    @staticmethod
+    def _bucket_percentile(stats, fraction):
+        """Upper bound of the bucket containing the given percentile"""
+        target = fraction * stats.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + [float("inf")], stats.bucket_counts):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0.0
+
+    def prometheus_text(self, caches=None):
+        """Render the histograms in the Prometheus text exposition format
+
+        caches optionally maps a cache name to its TTLCache.stats(), exported as
+        hit/miss counters and a size gauge.
+        """
+        lines = [
+            "# HELP todo_storage_operation_seconds Latency of storage operations.",
+            "# TYPE todo_storage_operation_seconds histogram",
+        ]
+        with self._lock:
+            operations = sorted(self._operations.items())
+            for operation, stats in operations:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ["+Inf"], stats.bucket_counts):
+                    cumulative += count
+                    lines.append(
+                        f'todo_storage_operation_seconds_bucket{{operation="{operation}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'todo_storage_operation_seconds_sum{{operation="{operation}"}} {stats.total_seconds}')
+                lines.append(f'todo_storage_operation_seconds_count{{operation="{operation}"}} {stats.count}')
+
+            lines.append("# HELP todo_storage_operation_documents_total Documents returned or affected.")
+            lines.append("# TYPE todo_storage_operation_documents_total counter")
+            for operation, stats in operations:
+                lines.append(f'todo_storage_operation_documents_total{{operation="{operation}"}} {stats.documents}')
+
+            lines.append("# HELP todo_storage_operation_errors_total Failed storage operations.")
+            lines.append("# TYPE todo_storage_operation_errors_total counter")
+            for operation, stats in operations:
+                lines.append(f'todo_storage_operation_errors_total{{operation="{operation}"}} {stats.errors}')
+
+            lines.append("# HELP todo_storage_operation_page_calls_total Storage calls per calling page.")
+            lines.append("# TYPE todo_storage_operation_page_calls_total counter")
+            for operation, stats in operations:
+                for page, count in sorted(stats.pages.items()):
+                    lines.append(
+                        f'todo_storage_operation_page_calls_total{{operation="{operation}",page="{page}"}} {count}'
+                    )
+
+        if caches:
+            for metric, field, kind, help_text in (
+                ("todo_cache_hits_total", "hits", "counter", "Cache lookups served from the cache."),
+                ("todo_cache_misses_total", "misses", "counter", "Cache lookups that called the loader."),
+                ("todo_cache_entries", "size", "gauge", "Entries currently in the cache."),
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} {kind}")
+                for name, stats in sorted(caches.items()):
+                    lines.append(f'{metric}{{cache="{name}"}} {stats[field]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Drop every recorded value"""
+        with self._lock:
+            self._operations.clear()
+
+
+metrics = Metrics()
+
+
+def _calling_page():
+    """Name of the Streamlit page (views/*.py or main.py) that issued the call"""
+    page = _page.get()
+    if page:
+        return page
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_VIEWS_DIR) or os.path.basename(filename) == "main.py":
+            return os.path.splitext(os.path.basename(filename))[0]
+        frame = frame.f_back
+    return "unknown"
+
+
+def page_context():
+    """Copy of the current context that keeps the calling page for calls run on another thread"""
+    context = copy_context()
+    if INSTRUMENTATION_ENABLED and not _page.get():
+        context.run(_page.set, _calling_page())
+    return context
+
+
+def _document_count(result):
+    """Number of documents returned or affected by a repository call"""
+    if isinstance(result, tuple):
+        result = result[0]
+    if result is None or result is False:
+        return 0
+    if isinstance(result, bool):
+        return 1
+    if isinstance(result, int):
+        return result
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict) and result and all(isinstance(value, list) for value in result.values()):
+        return sum(len(value) for value in result.values())
+    return 1
+
+
+def _timed_generator(generator, operation, page):
+    """Yield from a repository generator and record it once it is exhausted or closed
+
+    Only the time spent inside the generator is counted, not the time the
+    caller spends between items, and the document count is the number yielded.
+    """
+    elapsed = 0.0
+    count = 0
+    failed = False
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed += time.perf_counter() - start
+            count += 1
+            yield item
+    finally:
+        # Menutup generator asli juga menutup cursor database yang masih terbuka
+        generator.close()
+        metrics.record(operation, elapsed, count, page, failed=failed)
+
+
+class InstrumentedRepository:
+    """Proxy that records latency, documents and calling page of every repository call"""
+    def __init__(self, repository, name):
+        self._repository = repository
+        self._name = name
+
+    def __getattr__(self, attr):
+        value = getattr(self._repository, attr)
+        if attr.startswith("_") or not callable(value):
+            return value
+        operation = f"{self._name}.{attr}"
+
+        def timed(*args, **kwargs):
+            page = _calling_page()
+            start = time.perf_counter()
+            try:
+                result = value(*args, **kwargs)
+            except Exception:
+                metrics.record(operation, time.perf_counter() - start, 0, page, failed=True)
+                raise
+            if isinstance(result, GeneratorType):
+                # Pembuatan generator belum menjalankan query; dicatat saat generator selesai
+                return _timed_generator(result, operation, page)
+            metrics.record(operation, time.perf_counter() - start, _document_count(result), page)
+            return result
+
+        return timed
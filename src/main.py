@@ -1,14 +1,20 @@
-import time
 import streamlit as st
-import pandas as pd
 from Class import *
 from forms.register import register
+from instrumentation import INSTRUMENTATION_ENABLED, ADMIN_USERS
+from archive import start_archive_worker
+from change_watcher import change_watcher
+from components.live_refresh import watch_for_changes
 
 def main_application():
     """Main Streamlit application"""
     
     # Initialize user manager
-    user_manager = UserManager()
+    user_manager = get_user_manager()
+
+    # Pengarsipan tugas missed dan pemantau perubahan berjalan di thread latar (sekali per proses)
+    start_archive_worker()
+    change_watcher.start()
 
     # Authentication state
     if 'logged_in' not in st.session_state:
@@ -33,8 +39,7 @@ def main_application():
                     if success:
                         st.session_state.logged_in = True
                         st.session_state.username = username
-                        st.success(message)
-                        time.sleep(1)
+                        st.toast(message)
                         st.rerun()  # Rerun to reset the session state and display the logged-in view
                     else:
                         st.error(message)
@@ -64,20 +69,51 @@ def main_application():
             icon=":material/task:",
         )
         
-        pg = st.navigation(
-            {
-                "MENU": [beranda, tambah_tugas, tampilkan_tugas]
-            }
+        impor_ekspor = st.Page(
+            page="views/impor_ekspor.py",
+            title="Impor & Ekspor",
+            icon=":material/import_export:",
+        )
+        
+        arsip = st.Page(
+            page="views/arsip.py",
+            title="Arsip",
+            icon=":material/archive:",
+        )
+        
+        leaderboard = st.Page(
+            page="views/leaderboard.py",
+            title="Leaderboard",
+            icon=":material/leaderboard:",
         )
+        
+        pages = {
+            "MENU": [beranda, tambah_tugas, tampilkan_tugas, leaderboard, arsip, impor_ekspor]
+        }
+
+        # Halaman metrik hanya untuk admin ketika instrumentasi aktif
+        if INSTRUMENTATION_ENABLED and st.session_state.username in ADMIN_USERS:
+            pages["ADMIN"] = [
+                st.Page(
+                    page="views/metrics.py",
+                    title="Metrik",
+                    icon=":material/monitoring:",
+                )
+            ]
+
+        pg = st.navigation(pages)
         pg.run()
 
+        # Muat ulang halaman jika data pengguna diubah oleh sesi atau proses lain
+        change_watcher.track(st.session_state.username)
+        watch_for_changes(st.session_state.username)
+
         # Sidebar only visible after login
         with st.sidebar:
             if st.button("Log Out", type="primary", use_container_width=True):
                 st.session_state.logged_in = False
                 st.session_state.username = None
-                st.success("Logout berhasil.")
-                time.sleep(1)
+                st.toast("Logout berhasil.")
                 st.rerun()  # Rerun to reset the session state and remove the sidebar
 
         # Hide sidebar when user is not logged in
@@ -0,0 +1,180 @@
+"""Salted password hashing with a memory-hard KDF on a bounded worker pool.
+
+Hashes are stored as self-describing strings ("scrypt$n$r$p$salt$hash",
+"pbkdf2_sha256$iterations$salt$hash"), so the cost parameters can be
+changed at any time: hashes with other parameters, and the unsalted
+SHA-256 hex digests of older accounts, are re-hashed on the next login.
+"""
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+# Algoritma dan parameter biaya; naikkan seiring perangkat keras (lihat benchmarks/bench_login.py)
+PASSWORD_HASHER = os.environ.get("TODO_PASSWORD_HASHER", "scrypt")
+SCRYPT_N = int(os.environ.get("TODO_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.environ.get("TODO_SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("TODO_SCRYPT_P", "1"))
+PBKDF2_ITERATIONS = int(os.environ.get("TODO_PBKDF2_ITERATIONS", "600000"))
+# Jumlah hashing yang berjalan bersamaan; membatasi CPU dan memori (scrypt: 128 * n * r byte per hash)
+HASH_WORKERS = int(os.environ.get("TODO_HASH_WORKERS", "4"))
+
+SALT_BYTES = 16
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _b64decode(text):
+    return base64.b64decode(text.encode("ascii"))
+
+
+class PasswordHasher(ABC):
+    """Hashes and verifies passwords in one encoded format"""
+    algorithm = None
+
+    @abstractmethod
+    def hash(self, password):
+        """Return the encoded hash of a password with a new random salt"""
+
+    @abstractmethod
+    def verify(self, password, encoded):
+        """Return True if password matches an encoded hash of this algorithm"""
+
+    @abstractmethod
+    def needs_rehash(self, encoded):
+        """Return True if an encoded hash of this algorithm uses other cost parameters"""
+
+
+class ScryptHasher(PasswordHasher):
+    """scrypt (memory-hard) from the standard library"""
+    algorithm = "scrypt"
+
+    def __init__(self, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+        self.n, self.r, self.p = n, r, p
+
+    @staticmethod
+    def _derive(password, salt, n, r, p):
+        # maxmem default OpenSSL (32 MiB) terlalu kecil untuk n atau r yang lebih besar
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, maxmem=2 * 128 * n * r * (p + 1)
+        )
+
+    def hash(self, password):
+        salt = secrets.token_bytes(SALT_BYTES)
+        derived = self._derive(password, salt, self.n, self.r, self.p)
+        return f"scrypt${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(derived)}"
+
+    def verify(self, password, encoded):
+        _, n, r, p, salt, expected = encoded.split("$")
+        derived = self._derive(password, _b64decode(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(derived, _b64decode(expected))
+
+    def needs_rehash(self, encoded):
+        return encoded.split("$")[1:4] != [str(self.n), str(self.r), str(self.p)]
+
+
+class PBKDF2Hasher(PasswordHasher):
+    """PBKDF2-HMAC-SHA256, for hosts where scrypt's memory use is not acceptable"""
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=PBKDF2_ITERATIONS):
+        self.iterations = iterations
+
+    def hash(self, password):
+        salt = secrets.token_bytes(SALT_BYTES)
+        derived = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+        return f"pbkdf2_sha256${self.iterations}${_b64encode(salt)}${_b64encode(derived)}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, expected = encoded.split("$")
+        derived = hashlib.pbkdf2_hmac("sha256", password.encode(), _b64decode(salt), int(iterations))
+        return hmac.compare_digest(derived, _b64decode(expected))
+
+    def needs_rehash(self, encoded):
+        return encoded.split("$")[1] != str(self.iterations)
+
+
+class LegacySHA256Hasher(PasswordHasher):
+    """Unsalted SHA-256 hex digests of accounts registered before the KDF; verify only"""
+    algorithm = "sha256"
+
+    def hash(self, password):
+        raise NotImplementedError("Unsalted SHA-256 hashes are only verified, never created")
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), encoded)
+
+    def needs_rehash(self, encoded):
+        return True
+
+
+HASHERS = {hasher.algorithm: hasher for hasher in (ScryptHasher, PBKDF2Hasher)}
+
+
+class PasswordService:
+    """Runs the configured hasher on a bounded thread pool
+
+    hashlib's scrypt and pbkdf2_hmac release the GIL, so other sessions keep
+    running while a login or registration waits for its hash.
+    """
+    def __init__(self, hasher=None, workers=HASH_WORKERS):
+        self._executor = None
+        self.configure(hasher or HASHERS[PASSWORD_HASHER](), workers)
+
+    def configure(self, hasher, workers=HASH_WORKERS):
+        """Switch to another hasher and pool size (new hashes only; old ones upgrade on login)"""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+        self.hasher = hasher
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="todo-hash")
+        self._dummy_hash = None
+
+    def _hasher_for(self, encoded):
+        """Hasher matching the format of an encoded hash, or None for an unknown algorithm"""
+        algorithm = encoded.split("$", 1)[0] if "$" in encoded else LegacySHA256Hasher.algorithm
+        if algorithm == self.hasher.algorithm:
+            return self.hasher
+        if algorithm == LegacySHA256Hasher.algorithm:
+            return LegacySHA256Hasher()
+        if algorithm not in HASHERS:
+            return None
+        return HASHERS[algorithm]()
+
+    def hash(self, password):
+        """Hash a password off the calling thread"""
+        return self._executor.submit(self.hasher.hash, password).result()
+
+    def verify(self, password, encoded):
+        """Return (matches, new_hash); new_hash is set when the stored hash should be upgraded"""
+        if encoded is None:
+            # Pengguna tidak ada: tetap hitung hash agar waktu respons tidak membocorkannya
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hash(secrets.token_hex(8))
+            self._executor.submit(self.hasher.verify, password, self._dummy_hash).result()
+            return False, None
+
+        hasher = self._hasher_for(encoded)
+        if hasher is None:
+            # Hash tersimpan rusak atau dari algoritma yang tidak dikenal: login gagal, bukan error
+            logging.error(f"Stored password hash uses an unknown algorithm '{encoded.split('$', 1)[0]}'")
+            return False, None
+        try:
+            matches = self._executor.submit(hasher.verify, password, encoded).result()
+        except ValueError as e:
+            # Parameter atau base64 yang rusak di hash yang formatnya dikenal
+            logging.error(f"Stored {hasher.algorithm} password hash is malformed: {e}")
+            return False, None
+        if not matches:
+            return False, None
+        if hasher is not self.hasher or hasher.needs_rehash(encoded):
+            return True, self.hash(password)
+        return True, None
+
+
+password_service = PasswordService()
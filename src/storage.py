@@ -0,0 +1,315 @@
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
+from instrumentation import INSTRUMENTATION_ENABLED, InstrumentedRepository, page_context
+
+
+# Konfigurasi backend penyimpanan: "mongo" (default) atau "sqlite"
+STORAGE_BACKEND = os.environ.get("TODO_STORAGE_BACKEND", "mongo")
+MONGO_URI = os.environ.get("TODO_MONGO_URI", "mongodb://localhost:27017/")
+MONGO_DB_NAME = os.environ.get("TODO_MONGO_DB", "todo_list")
+SQLITE_PATH = os.environ.get("TODO_SQLITE_PATH", "todo_list.db")
+
+# Pengaturan pool dan timeout MongoClient; satu proses Streamlit melayani semua sesi
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.environ.get("TODO_MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.environ.get("TODO_MONGO_MIN_POOL_SIZE", "0")),
+    "waitQueueTimeoutMS": int(os.environ.get("TODO_MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+    "serverSelectionTimeoutMS": int(os.environ.get("TODO_MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "connectTimeoutMS": int(os.environ.get("TODO_MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.environ.get("TODO_MONGO_SOCKET_TIMEOUT_MS", "10000")),
+    "readPreference": os.environ.get("TODO_MONGO_READ_PREFERENCE", "primary"),
+    "retryWrites": os.environ.get("TODO_MONGO_RETRY_WRITES", "1") == "1",
+    "retryReads": os.environ.get("TODO_MONGO_RETRY_READS", "1") == "1",
+}
+
+# "1": periksa saat koneksi dibuka bahwa setiap query manager memakai index (gagal jika ada COLLSCAN)
+MONGO_CHECK_PLANS = os.environ.get("TODO_MONGO_CHECK_PLANS", "0") == "1"
+
+# Retensi tugas "missed": diarsipkan setelah N hari, lalu dihapus dari arsip setelah TTL
+ARCHIVE_AFTER_DAYS = int(os.environ.get("TODO_ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_TTL_DAYS = int(os.environ.get("TODO_ARCHIVE_TTL_DAYS", "365"))
+# Pengarsipan per batch dengan jeda antar batch agar laju tulis terbatas
+ARCHIVE_BATCH_SIZE = int(os.environ.get("TODO_ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_BATCH_INTERVAL = float(os.environ.get("TODO_ARCHIVE_BATCH_INTERVAL_MS", "200")) / 1000
+ARCHIVE_RUN_INTERVAL = float(os.environ.get("TODO_ARCHIVE_RUN_INTERVAL_MINUTES", "60")) * 60
+
+# Invalidasi cache lintas sesi/proses: "auto" (change stream, atau polling jika tidak tersedia), "poll" atau "off"
+CHANGE_WATCH = os.environ.get("TODO_CHANGE_WATCH", "auto")
+CHANGE_POLL_INTERVAL = float(os.environ.get("TODO_CHANGE_POLL_SECONDS", "5"))
+CHANGE_REFRESH_INTERVAL = float(os.environ.get("TODO_CHANGE_REFRESH_SECONDS", "3"))
+
+# Jumlah thread untuk pembacaan paralel dan batas waktu tunggu hasilnya (detik)
+READ_WORKERS = int(os.environ.get("TODO_READ_WORKERS", "8"))
+READ_TIMEOUT = float(os.environ.get("TODO_READ_TIMEOUT_MS", "10000")) / 1000
+
+# Leaderboard mingguan: jumlah pengguna teratas yang ditampilkan, dan batas peringkat yang dihitung
+# (pengguna di luar batas ini hanya diberi tahu bahwa peringkatnya lebih rendah)
+LEADERBOARD_SIZE = int(os.environ.get("TODO_LEADERBOARD_SIZE", "10"))
+LEADERBOARD_RANK_LIMIT = int(os.environ.get("TODO_LEADERBOARD_RANK_LIMIT", "1000"))
+
+# Field poin untuk setiap hari, diindeks dengan datetime.weekday()
+DAY_POINT_FIELDS = [
+    "point_senin",
+    "point_selasa",
+    "point_rabu",
+    "point_kamis",
+    "point_jumat",
+    "point_sabtu",
+    "point_minggu"
+]
+
+
+class UserRepository(ABC):
+    """Storage operations on user documents"""
+
+    @abstractmethod
+    def find_by_username(self, username):
+        """Return the user with this username, or None"""
+
+    @abstractmethod
+    def update_password(self, username, password_hash):
+        """Replace the stored password hash of a user"""
+
+    @abstractmethod
+    def insert(self, user_data):
+        """Insert a user; return False if the username already exists"""
+
+    @abstractmethod
+    def add_points(self, username, point_field, points, week_start, current_time):
+        """Atomically reset stale weekly points and add points; return the updated user"""
+
+
+class PointsRepository(ABC):
+    """Storage operations on the points ledger and its rollups"""
+
+    @abstractmethod
+    def record(self, entry, point_field):
+        """Append a ledger entry and update the daily and weekly rollups"""
+
+    @abstractmethod
+    def find_week(self, username, week_start):
+        """Return the weekly rollup of a user, or None"""
+
+    @abstractmethod
+    def find_weeks(self, username, since):
+        """Return weekly rollups with week_start >= since"""
+
+    @abstractmethod
+    def find_days(self, username, start, end):
+        """Return daily rollups with start <= date < end"""
+
+    @abstractmethod
+    def top_week(self, week_start, limit):
+        """Return the limit highest weekly totals as {"username", "total"}, highest first"""
+
+    @abstractmethod
+    def count_week_above(self, week_start, total, limit):
+        """Count users whose weekly total is above total, stopping at limit"""
+
+
+class TaskRepository(ABC):
+    """Storage operations on task documents"""
+
+    @abstractmethod
+    def insert(self, task_data):
+        """Insert a task; return False if its _id already exists"""
+
+    @abstractmethod
+    def insert_many(self, tasks):
+        """Insert a batch of tasks in order, skipping existing _ids; return the number inserted"""
+
+    @abstractmethod
+    def delete_and_return(self, username, task_id):
+        """Delete a task and return it, or None if it does not exist"""
+
+    @abstractmethod
+    def delete_and_return_many(self, username, task_ids, fields):
+        """Delete several tasks; return the given fields of only the tasks this call deleted"""
+
+    @abstractmethod
+    def find_by_ids(self, username, task_ids, fields):
+        """Return the given fields of several tasks"""
+
+    @abstractmethod
+    def delete(self, username, task_id):
+        """Delete a task"""
+
+    @abstractmethod
+    def delete_by_ids(self, username, task_ids):
+        """Delete several tasks; return the number deleted"""
+
+    @abstractmethod
+    def mark_missed(self, username, current_time):
+        """Mark urgent and common tasks with a passed deadline as missed"""
+
+    @abstractmethod
+    def mark_urgent(self, username, current_time, until):
+        """Mark common tasks with a deadline between current_time and until as urgent"""
+
+    @abstractmethod
+    def earliest_deadline(self, username, task_type):
+        """Return the earliest deadline among tasks of a type, or None"""
+
+    @abstractmethod
+    def update_deadline(self, username, task_id, deadline, task_type):
+        """Set deadline and type of a task; return the task name, or None"""
+
+    @abstractmethod
+    def load_pages(self, username, task_types, cursors, page_size, fields):
+        """Return up to page_size + 1 tasks per type after each (deadline, _id) cursor, and per-type counts"""
+
+    @abstractmethod
+    def find_description(self, username, task_id):
+        """Return the description of a task, or None"""
+
+    @abstractmethod
+    def iter_tasks(self, username, fields, batch_size):
+        """Yield all tasks of a user, fetching batch_size at a time"""
+
+    @abstractmethod
+    def search(self, username, filters, sort, cursor, page_size, fields):
+        """Return up to page_size + 1 tasks matching filters, ordered by sort = (field, 1 | -1) and _id,
+        after a (value, _id) cursor
+
+        filters may contain "terms" (words that must all occur in name or description),
+        "priorities", "deadline_from", "deadline_to", "min_point" and "max_point".
+        """
+
+    @abstractmethod
+    def fingerprints(self, usernames):
+        """Return a value per username that changes whenever one of the user's tasks changes"""
+
+    def watch_changes(self):
+        """Yield the username of every changed task or user as it happens (None if unknown)
+
+        Raises NotImplementedError when the backend has no change feed.
+        """
+        raise NotImplementedError("Storage backend has no change feed")
+
+    @abstractmethod
+    def archive_missed(self, deadline_before, archived_at, batch_size):
+        """Move up to batch_size tasks with a deadline before deadline_before, whatever their stored type, to the archive as missed; return their usernames"""
+
+    @abstractmethod
+    def purge_archive(self, archived_before):
+        """Delete tasks archived before archived_before; return the number deleted"""
+
+    @abstractmethod
+    def load_archive(self, username, cursor, page_size, fields):
+        """Return up to page_size + 1 archived tasks, newest first, before an (archived_at, _id) cursor"""
+
+
+class TaskRuleRepository(ABC):
+    """Storage operations on recurring task rules"""
+
+    @abstractmethod
+    def insert(self, rule):
+        """Insert a rule"""
+
+    @abstractmethod
+    def find_by_username(self, username):
+        """Return every rule of a user"""
+
+    @abstractmethod
+    def find_due(self, username, current_time):
+        """Return the rules whose current occurrence has a deadline at or before current_time"""
+
+    @abstractmethod
+    def find_by_task_ids(self, username, task_ids):
+        """Return the rules whose current occurrence is one of task_ids"""
+
+    @abstractmethod
+    def advance(self, rule_id, task_id, next_task_id, deadline):
+        """Point a rule at its next occurrence if its current one is still task_id; return True if updated"""
+
+    @abstractmethod
+    def delete(self, username, rule_id):
+        """Delete a rule; return True if it existed"""
+
+
+class Repositories:
+    """Singleton holding the repositories of the configured storage backend"""
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+            cls._instance._create(STORAGE_BACKEND)
+        return cls._instance
+
+    def _create(self, backend):
+        """Instantiate the repositories for a backend name"""
+        # Driver backend diimpor di sini agar pymongo/sqlite3 hanya dimuat jika dipakai
+        if backend == "mongo":
+            from storage_mongo import (
+                DatabaseConnection, MongoUserRepository, MongoPointsRepository, MongoTaskRepository,
+                MongoTaskRuleRepository
+            )
+            db_connection = DatabaseConnection()
+            self.users = MongoUserRepository(db_connection)
+            self.points = MongoPointsRepository(db_connection)
+            self.tasks = MongoTaskRepository(db_connection)
+            self.rules = MongoTaskRuleRepository(db_connection)
+        elif backend == "sqlite":
+            from storage_sqlite import (
+                SQLiteDatabase, SQLiteUserRepository, SQLitePointsRepository, SQLiteTaskRepository,
+                SQLiteTaskRuleRepository
+            )
+            database = SQLiteDatabase()
+            self.users = SQLiteUserRepository(database)
+            self.points = SQLitePointsRepository(database)
+            self.tasks = SQLiteTaskRepository(database)
+            self.rules = SQLiteTaskRuleRepository(database)
+        else:
+            raise ValueError(f"Unknown storage backend '{backend}'")
+
+        if INSTRUMENTATION_ENABLED:
+            self.users = InstrumentedRepository(self.users, "users")
+            self.points = InstrumentedRepository(self.points, "points")
+            self.tasks = InstrumentedRepository(self.tasks, "tasks")
+            self.rules = InstrumentedRepository(self.rules, "rules")
+
+
+def _backend_module():
+    """Import the module of the configured backend on first use"""
+    if STORAGE_BACKEND == "mongo":
+        import storage_mongo as backend
+    elif STORAGE_BACKEND == "sqlite":
+        import storage_sqlite as backend
+    else:
+        raise ValueError(f"Unknown storage backend '{STORAGE_BACKEND}'")
+    return backend
+
+
+def new_id():
+    """Return a new task or rule id of the configured backend (ObjectId on MongoDB, hex string on SQLite)"""
+    return _backend_module().new_id()
+
+
+def parse_id(value):
+    """Convert an id read from a file to the backend's id type; raise ValueError if it is not valid"""
+    return _backend_module().parse_id(value)
+
+
+_read_executor = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="todo-read")
+
+
+def run_concurrently(calls, timeout=READ_TIMEOUT):
+    """Run independent read calls on the shared pool and return their results by name
+
+    calls maps a name to a zero-argument callable. Raises TimeoutError when the
+    results are not all available within timeout seconds.
+    """
+    futures = {
+        name: _read_executor.submit(page_context().run, call)
+        for name, call in calls.items()
+    }
+    # Satu batas waktu untuk semua pembacaan, bukan timeout per hasil yang ditunggu berurutan
+    _, pending = wait(futures.values(), timeout=timeout)
+    if pending:
+        for future in pending:
+            future.cancel()
+        slow = ", ".join(name for name, future in futures.items() if future in pending)
+        raise TimeoutError(f"Reads not finished within {timeout} s: {slow}")
+    return {name: future.result() for name, future in futures.items()}
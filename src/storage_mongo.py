@@ -0,0 +1,656 @@
+"""MongoDB implementation of the storage repositories"""
+import logging
+import pytz
+from datetime import datetime, timedelta
+from pymongo import MongoClient, ASCENDING, DESCENDING, ReturnDocument, DeleteOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from bson import ObjectId
+from bson.errors import InvalidId
+from storage import (
+    MONGO_URI, MONGO_DB_NAME, MONGO_CLIENT_OPTIONS, MONGO_CHECK_PLANS, ARCHIVE_TTL_DAYS, DAY_POINT_FIELDS,
+    UserRepository, PointsRepository, TaskRepository, TaskRuleRepository
+)
+
+
+def new_id():
+    """Return a new document id"""
+    return ObjectId()
+
+
+def parse_id(value):
+    """Convert a hex string to an ObjectId; raise ValueError if it is not valid"""
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise ValueError(f"_id '{value}' bukan ObjectId yang valid")
+
+
+class DatabaseConnection:
+    """Singleton database connection manager"""
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+            cls._instance._connect()
+        return cls._instance
+
+    def _connect(self):
+        """Establish database connection"""
+        try:
+            self._client = MongoClient(MONGO_URI, **MONGO_CLIENT_OPTIONS)
+            self._db = self._client[MONGO_DB_NAME]
+            self._tasks_collection = self._db["tasks"]
+            self._users_collection = self._db["users"]
+            self._points_ledger_collection = self._db["points_ledger"]
+            self._points_daily_collection = self._db["points_daily"]
+            self._points_weekly_collection = self._db["points_weekly"]
+            self._tasks_archive_collection = self._db["tasks_archive"]
+            self._task_rules_collection = self._db["task_rules"]
+            self._ensure_indexes()
+            if MONGO_CHECK_PLANS:
+                self.check_manager_queries()
+            logging.info("Database connection established successfully.")
+        except Exception as e:
+            logging.error(f"Database connection failed: {e}")
+            raise
+
+    def _ensure_indexes(self):
+        """Create the indexes used by the managers (idempotent)"""
+        # create_index tidak melakukan apa-apa jika index dengan spesifikasi sama sudah ada
+        self._users_collection.create_index(
+            [("username", ASCENDING)], unique=True, name="username_unique"
+        )
+        # Halaman per jenis tugas: index seek dan urutan keyset (deadline, _id) langsung dari index
+        self._tasks_collection.create_index(
+            [("username", ASCENDING), ("type", ASCENDING), ("deadline", ASCENDING), ("_id", ASCENDING)],
+            name="username_type_deadline_id"
+        )
+        try:
+            # Digantikan oleh username_type_deadline_id
+            self._tasks_collection.drop_index("username_type_deadline")
+        except OperationFailure:
+            pass
+        self._tasks_collection.create_index(
+            [("username", ASCENDING), ("name", ASCENDING)],
+            name="username_name"
+        )
+        self._points_ledger_collection.create_index(
+            [("username", ASCENDING), ("awarded_at", ASCENDING)],
+            name="username_awarded_at"
+        )
+        self._points_daily_collection.create_index(
+            [("username", ASCENDING), ("date", ASCENDING)],
+            unique=True, name="username_date_unique"
+        )
+        self._points_weekly_collection.create_index(
+            [("username", ASCENDING), ("week_start", ASCENDING)],
+            unique=True, name="username_week_start_unique"
+        )
+        # Leaderboard mingguan dibaca langsung dari rollup, urut total
+        self._points_weekly_collection.create_index(
+            [("week_start", ASCENDING), ("total", DESCENDING), ("username", ASCENDING)],
+            name="week_start_total"
+        )
+        # Pencarian dan pengurutan daftar tugas
+        self._tasks_collection.create_index(
+            [("username", ASCENDING), ("deadline", ASCENDING), ("_id", ASCENDING)],
+            name="username_deadline"
+        )
+        self._tasks_collection.create_index(
+            [("username", ASCENDING), ("point", ASCENDING), ("_id", ASCENDING)],
+            name="username_point"
+        )
+        # Index teks per pengguna; tanpa stemming karena teks tugas berbahasa Indonesia
+        self._tasks_collection.create_index(
+            [("username", ASCENDING), ("name", "text"), ("description", "text")],
+            default_language="none", name="username_text"
+        )
+        # Sapuan pengarsipan lintas pengguna berdasarkan deadline saja: type tersimpan hanya
+        # diperbarui saat pengguna membuka daftar tugas, sehingga tidak dapat dipakai sebagai syarat
+        self._tasks_collection.create_index([("deadline", ASCENDING)], name="deadline")
+        try:
+            # Digantikan oleh index deadline
+            self._tasks_collection.drop_index("missed_deadline")
+        except OperationFailure:
+            pass
+        self._tasks_archive_collection.create_index(
+            [("username", ASCENDING), ("archived_at", DESCENDING), ("_id", DESCENDING)],
+            name="username_archived_at"
+        )
+        # Aturan tugas berulang: yang jatuh tempo saat sapuan tipe, dan yang okurensinya selesai
+        self._task_rules_collection.create_index(
+            [("username", ASCENDING), ("deadline", ASCENDING)],
+            name="username_deadline"
+        )
+        self._task_rules_collection.create_index(
+            [("username", ASCENDING), ("task_id", ASCENDING)],
+            name="username_task_id"
+        )
+        archive_ttl = ARCHIVE_TTL_DAYS * 24 * 3600
+        try:
+            self._tasks_archive_collection.create_index(
+                [("archived_at", ASCENDING)], expireAfterSeconds=archive_ttl, name="archived_at_ttl"
+            )
+        except OperationFailure:
+            # TTL diubah lewat konfigurasi: perbarui index yang sudah ada
+            self._db.command(
+                "collMod", "tasks_archive",
+                index={"name": "archived_at_ttl", "expireAfterSeconds": archive_ttl}
+            )
+
+    @staticmethod
+    def _plan_stages(plan):
+        """Yield every stage name in an explain() query plan tree"""
+        if not isinstance(plan, dict):
+            return
+        if "stage" in plan:
+            yield plan["stage"]
+        for key in ("inputStage", "queryPlan"):
+            if key in plan:
+                yield from DatabaseConnection._plan_stages(plan[key])
+        for child in plan.get("inputStages", []):
+            yield from DatabaseConnection._plan_stages(child)
+
+    def check_query_plan(self, collection, query, sort=None):
+        """Raise RuntimeError if the winning plan for a query is a COLLSCAN"""
+        cursor = collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in set(self._plan_stages(winning_plan)):
+            raise RuntimeError(
+                f"Query {query} on '{collection.name}' uses COLLSCAN: {winning_plan}"
+            )
+        return winning_plan
+
+    def check_manager_queries(self, username="__plan_check__"):
+        """Verify every query issued by the managers is served by an index"""
+        checks = [
+            (self._users_collection, {"username": username}, None),
+            (self._tasks_collection, {"username": username, "type": "urgent"}, None),
+            (self._tasks_collection,
+             {"username": username, "type": "common", **MongoTaskRepository._keyset_filter((datetime(1970, 1, 1), ObjectId()))},
+             [("deadline", ASCENDING), ("_id", ASCENDING)]),
+            (self._tasks_collection, {"username": username}, None),
+            (self._tasks_collection, {"_id": ObjectId(), "username": username}, None),
+            (self._tasks_collection, {"deadline": {"$lt": datetime(1970, 1, 1)}}, None),
+            (self._tasks_collection, {"username": username, "priority": {"$in": ["tinggi"]}},
+             [("deadline", ASCENDING), ("_id", ASCENDING)]),
+            (self._tasks_collection, {"username": username, "point": {"$gte": 10}},
+             [("point", DESCENDING), ("_id", DESCENDING)]),
+            (self._tasks_collection, {"username": username, "$text": {"$search": '"tugas"'}}, None),
+            (self._tasks_archive_collection, {"username": username},
+             [("archived_at", DESCENDING), ("_id", DESCENDING)]),
+            (self._points_weekly_collection, {"week_start": datetime(1970, 1, 1)},
+             [("total", DESCENDING), ("username", ASCENDING)]),
+            (self._points_weekly_collection, {"week_start": datetime(1970, 1, 1), "total": {"$gt": 0}}, None),
+            (self._task_rules_collection, {"username": username, "deadline": {"$lte": datetime(1970, 1, 1)}}, None),
+            (self._task_rules_collection, {"username": username, "task_id": {"$in": [ObjectId()]}}, None),
+        ]
+        for collection, query, sort in checks:
+            self.check_query_plan(collection, query, sort)
+        logging.info("All manager queries are served by an index.")
+
+    @property
+    def tasks_collection(self):
+        """Getter for tasks collection"""
+        return self._tasks_collection
+
+    @property
+    def users_collection(self):
+        """Getter for users collection"""
+        return self._users_collection
+
+    @property
+    def points_ledger_collection(self):
+        """Getter for append-only points ledger collection"""
+        return self._points_ledger_collection
+
+    @property
+    def points_daily_collection(self):
+        """Getter for daily points rollup collection"""
+        return self._points_daily_collection
+
+    @property
+    def points_weekly_collection(self):
+        """Getter for weekly points rollup collection"""
+        return self._points_weekly_collection
+
+    @property
+    def tasks_archive_collection(self):
+        """Getter for archived (old missed) tasks collection"""
+        return self._tasks_archive_collection
+
+    @property
+    def task_rules_collection(self):
+        """Getter for recurring task rules collection"""
+        return self._task_rules_collection
+
+
+class MongoUserRepository(UserRepository):
+    """User repository backed by the MongoDB users collection"""
+    def __init__(self, db_connection):
+        self._users_collection = db_connection.users_collection
+
+    def find_by_username(self, username):
+        return self._users_collection.find_one({"username": username})
+
+    def update_password(self, username, password_hash):
+        self._users_collection.update_one(
+            {"username": username}, {"$set": {"password": password_hash}}
+        )
+
+    def insert(self, user_data):
+        try:
+            self._users_collection.insert_one(user_data)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def add_points(self, username, point_field, points, week_start, current_time):
+        # Tahap 1 mereset poin jika reset terakhir sebelum week_start, tahap 2 menambah poin hari ini
+        default_last_reset = pytz.timezone('Asia/Jakarta').localize(datetime(1970, 1, 1))
+        needs_reset = {
+            "$lt": [
+                {"$ifNull": ["$last_point_reset", default_last_reset]},
+                week_start
+            ]
+        }
+        reset_stage = {
+            field: {"$cond": [needs_reset, 0, {"$ifNull": [f"${field}", 0]}]}
+            for field in DAY_POINT_FIELDS
+        }
+        reset_stage["last_point_reset"] = {
+            "$cond": [needs_reset, current_time, "$last_point_reset"]
+        }
+        increment_stage = {point_field: {"$add": [f"${point_field}", points]}}
+
+        return self._users_collection.find_one_and_update(
+            {"username": username},
+            [{"$set": reset_stage}, {"$set": increment_stage}],
+            return_document=ReturnDocument.AFTER
+        )
+
+
+class MongoPointsRepository(PointsRepository):
+    """Points repository backed by the MongoDB ledger and rollup collections"""
+    def __init__(self, db_connection):
+        self._points_ledger_collection = db_connection.points_ledger_collection
+        self._points_daily_collection = db_connection.points_daily_collection
+        self._points_weekly_collection = db_connection.points_weekly_collection
+
+    def record(self, entry, point_field):
+        self._points_ledger_collection.insert_one(dict(entry))
+        self._points_daily_collection.update_one(
+            {"username": entry["username"], "date": entry["date"]},
+            {"$inc": {"points": entry["points"]}},
+            upsert=True
+        )
+        self._points_weekly_collection.update_one(
+            {"username": entry["username"], "week_start": entry["week_start"]},
+            {"$inc": {"total": entry["points"], point_field: entry["points"]}},
+            upsert=True
+        )
+
+    def find_week(self, username, week_start):
+        return self._points_weekly_collection.find_one({
+            "username": username,
+            "week_start": week_start
+        })
+
+    def find_weeks(self, username, since):
+        return list(self._points_weekly_collection.find(
+            {"username": username, "week_start": {"$gte": since}},
+            projection={"week_start": 1, "total": 1}
+        ))
+
+    def find_days(self, username, start, end):
+        return list(self._points_daily_collection.find(
+            {"username": username, "date": {"$gte": start, "$lt": end}},
+            projection={"date": 1, "points": 1}
+        ))
+
+    def top_week(self, week_start, limit):
+        return list(self._points_weekly_collection.find(
+            {"week_start": week_start},
+            projection={"_id": 0, "username": 1, "total": 1},
+            sort=[("total", DESCENDING), ("username", ASCENDING)],
+            limit=limit
+        ))
+
+    def count_week_above(self, week_start, total, limit):
+        # Dihitung dari index week_start_total; limit membatasi jumlah kunci yang dipindai
+        return self._points_weekly_collection.count_documents(
+            {"week_start": week_start, "total": {"$gt": total}}, limit=limit
+        )
+
+
+class MongoTaskRepository(TaskRepository):
+    """Task repository backed by the MongoDB tasks collection"""
+    def __init__(self, db_connection):
+        self._tasks_collection = db_connection.tasks_collection
+        self._tasks_archive_collection = db_connection.tasks_archive_collection
+
+    def insert(self, task_data):
+        try:
+            self._tasks_collection.insert_one(task_data)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def insert_many(self, tasks):
+        inserted = 0
+        while tasks:
+            try:
+                return inserted + len(self._tasks_collection.insert_many(tasks, ordered=True).inserted_ids)
+            except BulkWriteError as e:
+                # ordered=True berhenti di dokumen pertama yang gagal; lewati duplikat lalu lanjutkan sisanya
+                error = e.details["writeErrors"][0]
+                if error["code"] != 11000:
+                    raise
+                inserted += e.details["nInserted"]
+                tasks = tasks[error["index"] + 1:]
+        return inserted
+
+    def delete_and_return(self, username, task_id):
+        return self._tasks_collection.find_one_and_delete({
+            "_id": task_id,
+            "username": username
+        })
+
+    def find_by_ids(self, username, task_ids, fields):
+        return list(self._tasks_collection.find(
+            {"_id": {"$in": list(task_ids)}, "username": username},
+            projection={field: 1 for field in fields}
+        ))
+
+    def delete(self, username, task_id):
+        self._tasks_collection.delete_one({"_id": task_id, "username": username})
+
+    # Klaim yang lebih lama dari ini dianggap milik proses yang gagal dan boleh diambil alih
+    CLAIM_TIMEOUT = timedelta(minutes=1)
+
+    def delete_and_return_many(self, username, task_ids, fields):
+        # Tandai dulu tugas dengan token unik: hanya satu pemanggil yang berhasil mengklaim
+        # setiap tugas, jadi pemanggil serentak tidak mengembalikan tugas yang sama
+        claim = ObjectId()
+        now = datetime.now(pytz.utc)
+        self._tasks_collection.update_many(
+            {
+                "_id": {"$in": list(task_ids)},
+                "username": username,
+                "$or": [
+                    {"claimed_at": {"$exists": False}},
+                    {"claimed_at": {"$lt": now - self.CLAIM_TIMEOUT}}
+                ]
+            },
+            {"$set": {"claim": claim, "claimed_at": now}}
+        )
+        tasks = list(self._tasks_collection.find(
+            {"username": username, "claim": claim},
+            projection={field: 1 for field in fields}
+        ))
+        if tasks:
+            self._tasks_collection.delete_many({"username": username, "claim": claim})
+        return tasks
+
+    def delete_by_ids(self, username, task_ids):
+        result = self._tasks_collection.bulk_write(
+            [DeleteOne({"_id": task_id, "username": username}) for task_id in task_ids],
+            ordered=False
+        )
+        return result.deleted_count
+
+    def mark_missed(self, username, current_time):
+        self._tasks_collection.update_many(
+            {
+                "username": username,
+                "type": {"$in": ["urgent", "common"]},
+                "deadline": {"$lt": current_time}
+            },
+            {"$set": {"type": "missed", "status": "missed"}}
+        )
+
+    def mark_urgent(self, username, current_time, until):
+        self._tasks_collection.update_many(
+            {
+                "username": username,
+                "type": "common",
+                "deadline": {"$gt": current_time, "$lt": until}
+            },
+            {"$set": {"type": "urgent"}}
+        )
+
+    def earliest_deadline(self, username, task_type):
+        task = self._tasks_collection.find_one(
+            {"username": username, "type": task_type},
+            projection={"deadline": 1},
+            sort=[("deadline", ASCENDING)]
+        )
+        return task["deadline"] if task else None
+
+    def update_deadline(self, username, task_id, deadline, task_type):
+        task = self._tasks_collection.find_one_and_update(
+            {"_id": task_id, "username": username},
+            {"$set": {"deadline": deadline, "type": task_type, "status": "ongoing"}},
+            projection={"name": 1}
+        )
+        return task["name"] if task else None
+
+    @staticmethod
+    def _keyset_filter(cursor):
+        """Build the filter for tasks after a (deadline, _id) cursor"""
+        if not cursor:
+            return {}
+        deadline, task_id = cursor
+        # $gte memberi batas bawah index pada deadline; $or hanya menyaring tugas dengan deadline sama
+        return {
+            "deadline": {"$gte": deadline},
+            "$or": [
+                {"deadline": {"$gt": deadline}},
+                {"_id": {"$gt": task_id}}
+            ]
+        }
+
+    def load_pages(self, username, task_types, cursors, page_size, fields):
+        # Satu aggregate (satu round trip): halaman setiap jenis tugas dan jumlah per jenis
+        # digabung dengan $unionWith. Tiap sub-pipeline diawali $match/$sort/$limit sehingga
+        # memakai index username_type_deadline_id, berbeda dengan $facet yang tidak memakai index
+        def page_pipeline(task_type):
+            return [
+                {"$match": {"username": username, "type": task_type, **self._keyset_filter(cursors.get(task_type))}},
+                {"$sort": {"deadline": ASCENDING, "_id": ASCENDING}},
+                {"$limit": page_size + 1},
+                {"$project": {**{field: 1 for field in fields}, "_page": {"$literal": task_type}}},
+            ]
+
+        first, *others = task_types
+        pipeline = page_pipeline(first)
+        for task_type in others:
+            pipeline.append({"$unionWith": {"coll": self._tasks_collection.name, "pipeline": page_pipeline(task_type)}})
+        # Jumlah per jenis hanya membutuhkan field type, sehingga dihitung dari index saja
+        pipeline.append({"$unionWith": {"coll": self._tasks_collection.name, "pipeline": [
+            {"$match": {"username": username}},
+            {"$group": {"_id": "$type", "count": {"$sum": 1}}},
+            {"$project": {"_id": 0, "_count_type": "$_id", "count": 1}},
+        ]}})
+
+        pages = {task_type: [] for task_type in task_types}
+        counts = {}
+        for row in self._tasks_collection.aggregate(pipeline):
+            if "_page" in row:
+                pages[row.pop("_page")].append(row)
+            else:
+                counts[row["_count_type"]] = row["count"]
+        # Urutan dokumen hasil $unionWith tidak dijamin, jadi setiap halaman diurutkan lagi
+        for page in pages.values():
+            page.sort(key=lambda task: (task["deadline"], task["_id"]))
+        return pages, counts
+
+    def find_description(self, username, task_id):
+        task = self._tasks_collection.find_one(
+            {"_id": task_id, "username": username},
+            projection={"description": 1}
+        )
+        return task["description"] if task else None
+
+    def iter_tasks(self, username, fields, batch_size):
+        with self._tasks_collection.find(
+            {"username": username},
+            projection={field: 1 for field in fields}
+        ).batch_size(batch_size) as cursor:
+            yield from cursor
+
+    def search(self, username, filters, sort, cursor, page_size, fields):
+        field, direction = sort
+        query = {"username": username}
+        if filters.get("terms"):
+            # Setiap kata diberi tanda kutip agar semuanya wajib muncul (AND), bukan salah satu
+            query["$text"] = {"$search": " ".join(f'"{term}"' for term in filters["terms"])}
+        if filters.get("priorities"):
+            query["priority"] = {"$in": list(filters["priorities"])}
+        for column, low, high in (("deadline", "deadline_from", "deadline_to"), ("point", "min_point", "max_point")):
+            bounds = {}
+            if filters.get(low) is not None:
+                bounds["$gte"] = filters[low]
+            if filters.get(high) is not None:
+                bounds["$lte"] = filters[high]
+            if bounds:
+                query[column] = bounds
+        if cursor:
+            value, task_id = cursor
+            op = "$gt" if direction == ASCENDING else "$lt"
+            query["$and"] = [{"$or": [{field: {op: value}}, {field: value, "_id": {op: task_id}}]}]
+        return list(self._tasks_collection.find(
+            query, projection={name: 1 for name in fields}
+        ).sort([(field, direction), ("_id", direction)]).limit(page_size + 1))
+
+    def fingerprints(self, usernames):
+        rows = self._tasks_collection.aggregate([
+            {"$match": {"username": {"$in": list(usernames)}}},
+            {"$group": {
+                "_id": "$username",
+                "count": {"$sum": 1},
+                "deadlines": {"$sum": {"$toLong": "$deadline"}},
+                "points": {"$sum": "$point"},
+                "types": {"$sum": {"$indexOfArray": [["common", "urgent", "missed"], "$type"]}},
+            }}
+        ])
+        return {row["_id"]: (row["count"], row["deadlines"], row["points"], row["types"]) for row in rows}
+
+    def watch_changes(self):
+        database = self._tasks_collection.database
+        try:
+            # Pre-image (MongoDB 6.0+) agar event delete tetap membawa username
+            database.command("collMod", "tasks", changeStreamPreAndPostImages={"enabled": True})
+        except OperationFailure as e:
+            logging.info(f"Change stream pre-images unavailable, deletes invalidate all users: {e}")
+        try:
+            stream = database.watch(
+                [{"$match": {
+                    "ns.coll": {"$in": ["tasks", "users"]},
+                    "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+                }}],
+                full_document="updateLookup",
+                full_document_before_change="whenAvailable"
+            )
+        except OperationFailure as e:
+            # Change stream hanya tersedia di replica set atau sharded cluster
+            raise NotImplementedError(str(e)) from e
+        with stream:
+            for change in stream:
+                document = change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+                yield document.get("username")
+
+    def archive_missed(self, deadline_before, archived_at, batch_size):
+        tasks = list(self._tasks_collection.find(
+            {"deadline": {"$lt": deadline_before}}
+        ).limit(batch_size))
+        if not tasks:
+            return []
+        for task in tasks:
+            # Tugas pengguna yang tidak login lagi masih bertipe urgent/common di database
+            task.update(type="missed", status="missed", archived_at=archived_at)
+        try:
+            self._tasks_archive_collection.insert_many(tasks, ordered=False)
+        except BulkWriteError as e:
+            # Tugas yang sudah disalin oleh percobaan sebelumnya (yang gagal sebelum delete) dilewati
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+        task_ids = [task["_id"] for task in tasks]
+        # Syarat deadline diulang: tugas yang dihidupkan lagi ("Perbarui Deadline")
+        # setelah find di atas tidak boleh ikut terhapus
+        self._tasks_collection.delete_many(
+            {"_id": {"$in": task_ids}, "deadline": {"$lt": deadline_before}}
+        )
+        revived = {
+            task["_id"] for task in self._tasks_collection.find({"_id": {"$in": task_ids}}, projection={"_id": 1})
+        }
+        if revived:
+            # Salinan arsip dari tugas yang tetap aktif dibuang
+            self._tasks_archive_collection.delete_many({"_id": {"$in": list(revived)}})
+        return [task["username"] for task in tasks if task["_id"] not in revived]
+
+    def purge_archive(self, archived_before):
+        # Dihapus oleh index TTL archived_at_ttl di server
+        return 0
+
+    def load_archive(self, username, cursor, page_size, fields):
+        query = {"username": username}
+        if cursor:
+            archived_at, task_id = cursor
+            query["$or"] = [
+                {"archived_at": {"$lt": archived_at}},
+                {"archived_at": archived_at, "_id": {"$lt": task_id}}
+            ]
+        return list(self._tasks_archive_collection.find(
+            query, projection={field: 1 for field in fields}
+        ).sort([("archived_at", DESCENDING), ("_id", DESCENDING)]).limit(page_size + 1))
+
+
+class MongoTaskRuleRepository(TaskRuleRepository):
+    """Recurring task rule repository backed by the MongoDB task_rules collection"""
+    def __init__(self, db_connection):
+        self._task_rules_collection = db_connection.task_rules_collection
+
+    def insert(self, rule):
+        self._task_rules_collection.insert_one(rule)
+
+    def find_by_username(self, username):
+        return list(self._task_rules_collection.find({"username": username}).sort("deadline", ASCENDING))
+
+    def find_due(self, username, current_time):
+        return list(self._task_rules_collection.find(
+            {"username": username, "deadline": {"$lte": current_time}}
+        ))
+
+    def find_by_task_ids(self, username, task_ids):
+        return list(self._task_rules_collection.find(
+            {"username": username, "task_id": {"$in": list(task_ids)}}
+        ))
+
+    def advance(self, rule_id, task_id, next_task_id, deadline):
+        result = self._task_rules_collection.update_one(
+            {"_id": rule_id, "task_id": task_id},
+            {"$set": {"task_id": next_task_id, "deadline": deadline}}
+        )
+        return result.modified_count == 1
+
+    def delete(self, username, rule_id):
+        result = self._task_rules_collection.delete_one({"_id": rule_id, "username": username})
+        return result.deleted_count == 1
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="MongoDB storage maintenance")
+    parser.add_argument("--check-plans", action="store_true",
+                        help="create the indexes and fail if a manager query uses COLLSCAN")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.check_plans:
+        # RuntimeError dari check_query_plan menghentikan proses dengan status bukan nol
+        DatabaseConnection().check_manager_queries()
+    else:
+        parser.print_help()
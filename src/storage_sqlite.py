@@ -0,0 +1,697 @@
+"""Embedded SQLite implementation of the storage repositories"""
+import itertools
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import pytz
+from contextlib import contextmanager
+from datetime import datetime
+from storage import (
+    SQLITE_PATH, DAY_POINT_FIELDS, UserRepository, PointsRepository, TaskRepository, TaskRuleRepository
+)
+
+
+# Id berformat seperti ObjectId (detik, 5 byte acak per proses, penghitung), tanpa membutuhkan bson;
+# urutan teksnya mengikuti waktu pembuatan seperti ObjectId
+_ID_PROCESS_PART = os.urandom(5).hex()
+_id_counter = itertools.count(random.randrange(0x1000000))
+
+
+def new_id():
+    """Return a new 24-digit hex id laid out like an ObjectId"""
+    return f"{int(time.time()):08x}{_ID_PROCESS_PART}{next(_id_counter) & 0xFFFFFF:06x}"
+
+
+def parse_id(value):
+    """Normalize a 24-digit hex id; raise ValueError if it is not valid"""
+    text = str(value).strip().lower()
+    if len(text) != 24 or any(char not in "0123456789abcdef" for char in text):
+        raise ValueError(f"_id '{value}' bukan id yang valid")
+    return text
+
+
+def _to_sql_time(value):
+    """Convert a datetime to sortable text; aware values are stored as naive UTC like MongoDB"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(pytz.utc).replace(tzinfo=None)
+    return value.isoformat(sep=" ", timespec="microseconds")
+
+
+def _to_sql_value(value):
+    """Convert a query parameter; datetimes are stored as text"""
+    return _to_sql_time(value) if isinstance(value, datetime) else value
+
+
+def _from_sql_time(value):
+    """Convert text written by _to_sql_time back to a datetime"""
+    return datetime.fromisoformat(value) if value else None
+
+
+class SQLiteDatabase:
+    """Singleton embedded SQLite connection"""
+    _instance = None
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password TEXT NOT NULL,
+            point_senin INTEGER NOT NULL DEFAULT 0,
+            point_selasa INTEGER NOT NULL DEFAULT 0,
+            point_rabu INTEGER NOT NULL DEFAULT 0,
+            point_kamis INTEGER NOT NULL DEFAULT 0,
+            point_jumat INTEGER NOT NULL DEFAULT 0,
+            point_sabtu INTEGER NOT NULL DEFAULT 0,
+            point_minggu INTEGER NOT NULL DEFAULT 0,
+            last_point_reset TEXT
+        );
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            priority TEXT,
+            deadline TEXT NOT NULL,
+            point INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            type TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS tasks_username_type_deadline
+            ON tasks (username, type, deadline, id);
+        CREATE INDEX IF NOT EXISTS tasks_username_name
+            ON tasks (username, name);
+        CREATE TABLE IF NOT EXISTS points_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            points INTEGER NOT NULL,
+            task_names TEXT NOT NULL,
+            awarded_at TEXT NOT NULL,
+            date TEXT NOT NULL,
+            week_start TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS points_ledger_username_awarded_at
+            ON points_ledger (username, awarded_at);
+        CREATE TABLE IF NOT EXISTS points_daily (
+            username TEXT NOT NULL,
+            date TEXT NOT NULL,
+            points INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, date)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS points_weekly (
+            username TEXT NOT NULL,
+            week_start TEXT NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            point_senin INTEGER NOT NULL DEFAULT 0,
+            point_selasa INTEGER NOT NULL DEFAULT 0,
+            point_rabu INTEGER NOT NULL DEFAULT 0,
+            point_kamis INTEGER NOT NULL DEFAULT 0,
+            point_jumat INTEGER NOT NULL DEFAULT 0,
+            point_sabtu INTEGER NOT NULL DEFAULT 0,
+            point_minggu INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, week_start)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS points_weekly_week_start_total
+            ON points_weekly (week_start, total DESC, username);
+        CREATE INDEX IF NOT EXISTS tasks_username_deadline
+            ON tasks (username, deadline, id);
+        CREATE INDEX IF NOT EXISTS tasks_username_point
+            ON tasks (username, point, id);
+        DROP INDEX IF EXISTS tasks_missed_deadline;
+        CREATE INDEX IF NOT EXISTS tasks_deadline
+            ON tasks (deadline);
+        CREATE TABLE IF NOT EXISTS tasks_archive (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            priority TEXT,
+            deadline TEXT NOT NULL,
+            point INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            type TEXT NOT NULL,
+            archived_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS tasks_archive_username_archived_at
+            ON tasks_archive (username, archived_at, id);
+        CREATE INDEX IF NOT EXISTS tasks_archive_archived_at
+            ON tasks_archive (archived_at);
+        CREATE TABLE IF NOT EXISTS task_rules (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            priority TEXT,
+            frequency TEXT NOT NULL,
+            weekdays TEXT NOT NULL,
+            interval_days INTEGER NOT NULL,
+            start TEXT NOT NULL,
+            task_id TEXT,
+            deadline TEXT
+        );
+        CREATE INDEX IF NOT EXISTS task_rules_username_deadline
+            ON task_rules (username, deadline);
+        CREATE INDEX IF NOT EXISTS task_rules_username_task_id
+            ON task_rules (username, task_id);
+    """
+
+    # Index teks nama dan deskripsi; isinya disinkronkan dengan tabel tasks lewat trigger
+    _FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE tasks_fts USING fts5(
+            name, description, content='tasks', content_rowid='rowid'
+        );
+        CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, name, description) VALUES (new.rowid, new.name, new.description);
+        END;
+        CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, name, description)
+                VALUES ('delete', old.rowid, old.name, old.description);
+        END;
+        CREATE TRIGGER tasks_fts_update AFTER UPDATE OF name, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, name, description)
+                VALUES ('delete', old.rowid, old.name, old.description);
+            INSERT INTO tasks_fts (rowid, name, description) VALUES (new.rowid, new.name, new.description);
+        END;
+        INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild');
+    """
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+            cls._instance._connect()
+        return cls._instance
+
+    def _connect(self):
+        """Open the database file and create the schema (idempotent)"""
+        try:
+            # isolation_level=None: autocommit, transaksi dibuka secara eksplisit
+            self._connection = sqlite3.connect(
+                SQLITE_PATH, check_same_thread=False, isolation_level=None
+            )
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(self._SCHEMA)
+            if not self._connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'"
+            ).fetchone():
+                # Database lama: buat index teks dan isi dari tugas yang sudah ada
+                self._connection.executescript(self._FTS_SCHEMA)
+            self._lock = threading.RLock()
+            logging.info(f"SQLite database '{SQLITE_PATH}' opened successfully.")
+        except Exception as e:
+            logging.error(f"SQLite database connection failed: {e}")
+            raise
+
+    def query(self, sql, params=()):
+        """Run a statement and return all rows"""
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    @contextmanager
+    def transaction(self):
+        """Run several statements atomically on the shared connection"""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    @contextmanager
+    def snapshot(self):
+        """Run several reads on one consistent snapshot without taking the write lock"""
+        with self._lock:
+            # BEGIN biasa (deferred) hanya membuka snapshot baca WAL: tidak menunggu
+            # dan tidak menghalangi penulis di proses lain seperti BEGIN IMMEDIATE
+            self._connection.execute("BEGIN")
+            try:
+                yield self._connection
+            finally:
+                self._connection.execute("COMMIT")
+
+
+def _user_from_row(row):
+    """Convert a users row to a user document"""
+    if row is None:
+        return None
+    user = dict(row)
+    user["last_point_reset"] = _from_sql_time(user["last_point_reset"])
+    return user
+
+
+def _task_from_row(row):
+    """Convert a tasks row to a task document"""
+    task = dict(row)
+    if "id" in task:
+        task["_id"] = task.pop("id")
+    for field in ("deadline", "archived_at"):
+        if field in task:
+            task[field] = _from_sql_time(task[field])
+    return task
+
+
+def _rule_from_row(row):
+    """Convert a task_rules row to a rule document"""
+    rule = dict(row)
+    rule["_id"] = rule.pop("id")
+    rule["weekdays"] = json.loads(rule["weekdays"])
+    for field in ("start", "deadline"):
+        rule[field] = _from_sql_time(rule[field])
+    return rule
+
+
+def _task_columns(fields):
+    """Map task document fields to tasks columns"""
+    return ", ".join(["id"] + [field for field in fields if field != "_id"])
+
+
+class SQLiteUserRepository(UserRepository):
+    """User repository backed by the SQLite users table"""
+    def __init__(self, database):
+        self._database = database
+
+    def find_by_username(self, username):
+        rows = self._database.query("SELECT * FROM users WHERE username = ?", (username,))
+        return _user_from_row(rows[0]) if rows else None
+
+    def update_password(self, username, password_hash):
+        self._database.query(
+            "UPDATE users SET password = ? WHERE username = ?", (password_hash, username)
+        )
+
+    def insert(self, user_data):
+        columns = list(user_data)
+        values = [
+            _to_sql_time(value) if isinstance(value, datetime) else value
+            for value in user_data.values()
+        ]
+        try:
+            self._database.query(
+                f"INSERT INTO users ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                values
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def add_points(self, username, point_field, points, week_start, current_time):
+        if point_field not in DAY_POINT_FIELDS:
+            raise ValueError(f"Unknown point field '{point_field}'")
+        # Semua ekspresi SET dievaluasi terhadap nilai lama, jadi reset dan tambah terjadi dalam satu UPDATE
+        needs_reset = "COALESCE(last_point_reset, '') < :week_start"
+        assignments = [
+            f"{field} = CASE WHEN {needs_reset} THEN 0 ELSE {field} END"
+            + (" + :points" if field == point_field else "")
+            for field in DAY_POINT_FIELDS
+        ]
+        assignments.append(
+            f"last_point_reset = CASE WHEN {needs_reset} THEN :now ELSE last_point_reset END"
+        )
+        with self._database.transaction() as connection:
+            connection.execute(
+                f"UPDATE users SET {', '.join(assignments)} WHERE username = :username",
+                {
+                    "week_start": _to_sql_time(week_start),
+                    "now": _to_sql_time(current_time),
+                    "points": points,
+                    "username": username
+                }
+            )
+            row = connection.execute(
+                "SELECT * FROM users WHERE username = ?", (username,)
+            ).fetchone()
+        return _user_from_row(row)
+
+
+class SQLitePointsRepository(PointsRepository):
+    """Points repository backed by the SQLite ledger and rollup tables"""
+    def __init__(self, database):
+        self._database = database
+
+    def record(self, entry, point_field):
+        if point_field not in DAY_POINT_FIELDS:
+            raise ValueError(f"Unknown point field '{point_field}'")
+        username = entry["username"]
+        points = entry["points"]
+        day_key = _to_sql_time(entry["date"])
+        week_start = _to_sql_time(entry["week_start"])
+        with self._database.transaction() as connection:
+            connection.execute(
+                "INSERT INTO points_ledger (username, points, task_names, awarded_at, date, week_start) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (username, points, json.dumps(entry["task_names"]),
+                 _to_sql_time(entry["awarded_at"]), day_key, week_start)
+            )
+            connection.execute(
+                "INSERT INTO points_daily (username, date, points) VALUES (?, ?, ?) "
+                "ON CONFLICT (username, date) DO UPDATE SET points = points + excluded.points",
+                (username, day_key, points)
+            )
+            connection.execute(
+                f"INSERT INTO points_weekly (username, week_start, total, {point_field}) VALUES (?, ?, ?, ?) "
+                f"ON CONFLICT (username, week_start) DO UPDATE SET "
+                f"total = total + excluded.total, {point_field} = {point_field} + excluded.{point_field}",
+                (username, week_start, points, points)
+            )
+
+    def find_week(self, username, week_start):
+        rows = self._database.query(
+            "SELECT * FROM points_weekly WHERE username = ? AND week_start = ?",
+            (username, _to_sql_time(week_start))
+        )
+        return dict(rows[0]) if rows else None
+
+    def find_weeks(self, username, since):
+        rows = self._database.query(
+            "SELECT week_start, total FROM points_weekly WHERE username = ? AND week_start >= ?",
+            (username, _to_sql_time(since))
+        )
+        return [
+            {"week_start": _from_sql_time(row["week_start"]), "total": row["total"]}
+            for row in rows
+        ]
+
+    def find_days(self, username, start, end):
+        rows = self._database.query(
+            "SELECT date, points FROM points_daily WHERE username = ? AND date >= ? AND date < ?",
+            (username, _to_sql_time(start), _to_sql_time(end))
+        )
+        return [
+            {"date": _from_sql_time(row["date"]), "points": row["points"]}
+            for row in rows
+        ]
+
+    def top_week(self, week_start, limit):
+        rows = self._database.query(
+            "SELECT username, total FROM points_weekly WHERE week_start = ? "
+            "ORDER BY total DESC, username LIMIT ?",
+            (_to_sql_time(week_start), limit)
+        )
+        return [dict(row) for row in rows]
+
+    def count_week_above(self, week_start, total, limit):
+        rows = self._database.query(
+            "SELECT COUNT(*) AS above FROM ("
+            "SELECT 1 FROM points_weekly WHERE week_start = ? AND total > ? LIMIT ?)",
+            (_to_sql_time(week_start), total, limit)
+        )
+        return rows[0]["above"]
+
+
+class SQLiteTaskRepository(TaskRepository):
+    """Task repository backed by the SQLite tasks table"""
+    def __init__(self, database):
+        self._database = database
+
+    _INSERT = (
+        "INTO tasks (id, username, name, description, priority, deadline, point, status, type) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+
+    @staticmethod
+    def _task_values(task_data):
+        """Column values of a task document, in _INSERT order"""
+        return (str(task_data["_id"]), task_data["username"], task_data["name"],
+                task_data["description"], task_data["priority"],
+                _to_sql_time(task_data["deadline"]), task_data["point"],
+                task_data["status"], task_data["type"])
+
+    def insert(self, task_data):
+        try:
+            self._database.query("INSERT " + self._INSERT, self._task_values(task_data))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def insert_many(self, tasks):
+        with self._database.transaction() as connection:
+            # rowcount tidak ikut menghitung baris yang ditulis trigger FTS
+            return connection.executemany(
+                "INSERT OR IGNORE " + self._INSERT, [self._task_values(task) for task in tasks]
+            ).rowcount
+
+    def delete_and_return(self, username, task_id):
+        with self._database.transaction() as connection:
+            row = connection.execute(
+                "SELECT * FROM tasks WHERE id = ? AND username = ?", (str(task_id), username)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("DELETE FROM tasks WHERE id = ?", (str(task_id),))
+        return _task_from_row(row)
+
+    def find_by_ids(self, username, task_ids, fields):
+        task_ids = [str(task_id) for task_id in task_ids]
+        if not task_ids:
+            return []
+        rows = self._database.query(
+            f"SELECT {_task_columns(fields)} FROM tasks "
+            f"WHERE username = ? AND id IN ({', '.join('?' * len(task_ids))})",
+            [username, *task_ids]
+        )
+        return [_task_from_row(row) for row in rows]
+
+    def delete(self, username, task_id):
+        self._database.query(
+            "DELETE FROM tasks WHERE id = ? AND username = ?", (str(task_id), username)
+        )
+
+    def delete_and_return_many(self, username, task_ids, fields):
+        task_ids = [str(task_id) for task_id in task_ids]
+        if not task_ids:
+            return []
+        # RETURNING hanya berisi baris yang benar-benar dihapus oleh pernyataan ini
+        with self._database.transaction() as connection:
+            rows = connection.execute(
+                f"DELETE FROM tasks WHERE username = ? AND id IN ({', '.join('?' * len(task_ids))}) "
+                f"RETURNING {_task_columns(fields)}",
+                [username, *task_ids]
+            ).fetchall()
+        return [_task_from_row(row) for row in rows]
+
+    def delete_by_ids(self, username, task_ids):
+        task_ids = [str(task_id) for task_id in task_ids]
+        if not task_ids:
+            return 0
+        with self._database.transaction() as connection:
+            cursor = connection.execute(
+                f"DELETE FROM tasks WHERE username = ? AND id IN ({', '.join('?' * len(task_ids))})",
+                [username, *task_ids]
+            )
+        return cursor.rowcount
+
+    def mark_missed(self, username, current_time):
+        self._database.query(
+            "UPDATE tasks SET type = 'missed', status = 'missed' "
+            "WHERE username = ? AND type IN ('urgent', 'common') AND deadline < ?",
+            (username, _to_sql_time(current_time))
+        )
+
+    def mark_urgent(self, username, current_time, until):
+        self._database.query(
+            "UPDATE tasks SET type = 'urgent' "
+            "WHERE username = ? AND type = 'common' AND deadline > ? AND deadline < ?",
+            (username, _to_sql_time(current_time), _to_sql_time(until))
+        )
+
+    def earliest_deadline(self, username, task_type):
+        rows = self._database.query(
+            "SELECT MIN(deadline) AS deadline FROM tasks WHERE username = ? AND type = ?",
+            (username, task_type)
+        )
+        return _from_sql_time(rows[0]["deadline"])
+
+    def update_deadline(self, username, task_id, deadline, task_type):
+        with self._database.transaction() as connection:
+            connection.execute(
+                "UPDATE tasks SET deadline = ?, type = ?, status = 'ongoing' WHERE id = ? AND username = ?",
+                (_to_sql_time(deadline), task_type, str(task_id), username)
+            )
+            row = connection.execute(
+                "SELECT name FROM tasks WHERE id = ? AND username = ?", (str(task_id), username)
+            ).fetchone()
+        return row["name"] if row else None
+
+    def load_pages(self, username, task_types, cursors, page_size, fields):
+        pages = {}
+        with self._database.snapshot() as connection:
+            for task_type in task_types:
+                sql = f"SELECT {_task_columns(fields)} FROM tasks WHERE username = ? AND type = ?"
+                params = [username, task_type]
+                cursor = cursors.get(task_type)
+                if cursor:
+                    # Keyset pada (deadline, id); urutan teks id hex sama dengan urutan pembuatannya
+                    deadline, task_id = _to_sql_time(cursor[0]), str(cursor[1])
+                    sql += " AND (deadline > ? OR (deadline = ? AND id > ?))"
+                    params += [deadline, deadline, task_id]
+                sql += " ORDER BY deadline, id LIMIT ?"
+                params.append(page_size + 1)
+                pages[task_type] = [_task_from_row(row) for row in connection.execute(sql, params)]
+            counts = {
+                row["type"]: row["count"]
+                for row in connection.execute(
+                    "SELECT type, COUNT(*) AS count FROM tasks WHERE username = ? GROUP BY type",
+                    (username,)
+                )
+            }
+        return pages, counts
+
+    def find_description(self, username, task_id):
+        rows = self._database.query(
+            "SELECT description FROM tasks WHERE id = ? AND username = ?", (str(task_id), username)
+        )
+        return rows[0]["description"] if rows else None
+
+    def iter_tasks(self, username, fields, batch_size):
+        # Keyset pada id: setiap batch adalah query terpisah, sehingga lock tidak ditahan di antara yield
+        last_id = ""
+        while True:
+            rows = self._database.query(
+                f"SELECT {_task_columns(fields)} FROM tasks WHERE username = ? AND id > ? ORDER BY id LIMIT ?",
+                (username, last_id, batch_size)
+            )
+            for row in rows:
+                yield _task_from_row(row)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]["id"]
+
+    _SORT_COLUMNS = {"deadline", "point", "name"}
+
+    def search(self, username, filters, sort, cursor, page_size, fields):
+        field, direction = sort
+        if field not in self._SORT_COLUMNS:
+            raise ValueError(f"Cannot sort tasks by '{field}'")
+        sql = f"SELECT {_task_columns(fields)} FROM tasks WHERE username = ?"
+        params = [username]
+        if filters.get("terms"):
+            # Setiap kata dikutip sebagai token FTS5; beberapa kata berarti semuanya wajib ada
+            sql += " AND rowid IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)"
+            params.append(" ".join('"' + term.replace('"', '""') + '"' for term in filters["terms"]))
+        if filters.get("priorities"):
+            sql += f" AND priority IN ({', '.join('?' * len(filters['priorities']))})"
+            params += list(filters["priorities"])
+        for column, low, high in (("deadline", "deadline_from", "deadline_to"), ("point", "min_point", "max_point")):
+            if filters.get(low) is not None:
+                sql += f" AND {column} >= ?"
+                params.append(_to_sql_value(filters[low]))
+            if filters.get(high) is not None:
+                sql += f" AND {column} <= ?"
+                params.append(_to_sql_value(filters[high]))
+        op, order = (">", "ASC") if direction == 1 else ("<", "DESC")
+        if cursor:
+            value, task_id = _to_sql_value(cursor[0]), str(cursor[1])
+            sql += f" AND ({field} {op} ? OR ({field} = ? AND id {op} ?))"
+            params += [value, value, task_id]
+        sql += f" ORDER BY {field} {order}, id {order} LIMIT ?"
+        params.append(page_size + 1)
+        return [_task_from_row(row) for row in self._database.query(sql, params)]
+
+    def fingerprints(self, usernames):
+        usernames = list(usernames)
+        rows = self._database.query(
+            "SELECT username, COUNT(*) AS count, SUM(julianday(deadline)) AS deadlines, SUM(point) AS points, "
+            "SUM(CASE type WHEN 'urgent' THEN 1 WHEN 'missed' THEN 2 ELSE 0 END) AS types "
+            f"FROM tasks WHERE username IN ({', '.join('?' * len(usernames))}) GROUP BY username",
+            usernames
+        )
+        return {row["username"]: (row["count"], row["deadlines"], row["points"], row["types"]) for row in rows}
+
+    def archive_missed(self, deadline_before, archived_at, batch_size):
+        with self._database.transaction() as connection:
+            # Type tersimpan tidak dipakai: tugas pengguna yang tidak login lagi masih urgent/common
+            rows = connection.execute(
+                "SELECT id, username FROM tasks WHERE deadline < ? LIMIT ?",
+                (_to_sql_time(deadline_before), batch_size)
+            ).fetchall()
+            if not rows:
+                return []
+            ids = [row["id"] for row in rows]
+            placeholders = ", ".join("?" * len(ids))
+            connection.execute(
+                "INSERT OR IGNORE INTO tasks_archive "
+                "SELECT id, username, name, description, priority, deadline, point, 'missed', 'missed', ? "
+                f"FROM tasks WHERE id IN ({placeholders})",
+                [_to_sql_time(archived_at)] + ids
+            )
+            connection.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", ids)
+        return [row["username"] for row in rows]
+
+    def purge_archive(self, archived_before):
+        with self._database.transaction() as connection:
+            return connection.execute(
+                "DELETE FROM tasks_archive WHERE archived_at < ?", (_to_sql_time(archived_before),)
+            ).rowcount
+
+    def load_archive(self, username, cursor, page_size, fields):
+        sql = f"SELECT {_task_columns(fields)} FROM tasks_archive WHERE username = ?"
+        params = [username]
+        if cursor:
+            archived_at, task_id = _to_sql_time(cursor[0]), str(cursor[1])
+            sql += " AND (archived_at < ? OR (archived_at = ? AND id < ?))"
+            params += [archived_at, archived_at, task_id]
+        sql += " ORDER BY archived_at DESC, id DESC LIMIT ?"
+        params.append(page_size + 1)
+        return [_task_from_row(row) for row in self._database.query(sql, params)]
+
+
+class SQLiteTaskRuleRepository(TaskRuleRepository):
+    """Recurring task rule repository backed by the SQLite task_rules table"""
+    def __init__(self, database):
+        self._database = database
+
+    def insert(self, rule):
+        self._database.query(
+            "INSERT INTO task_rules (id, username, name, description, priority, frequency, weekdays, "
+            "interval_days, start, task_id, deadline) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(rule["_id"]), rule["username"], rule["name"], rule["description"], rule["priority"],
+             rule["frequency"], json.dumps(rule["weekdays"]), rule["interval_days"],
+             _to_sql_time(rule["start"]), str(rule["task_id"]) if rule["task_id"] else None,
+             _to_sql_time(rule["deadline"]))
+        )
+
+    def find_by_username(self, username):
+        rows = self._database.query(
+            "SELECT * FROM task_rules WHERE username = ? ORDER BY deadline", (username,)
+        )
+        return [_rule_from_row(row) for row in rows]
+
+    def find_due(self, username, current_time):
+        rows = self._database.query(
+            "SELECT * FROM task_rules WHERE username = ? AND deadline <= ?",
+            (username, _to_sql_time(current_time))
+        )
+        return [_rule_from_row(row) for row in rows]
+
+    def find_by_task_ids(self, username, task_ids):
+        task_ids = [str(task_id) for task_id in task_ids]
+        if not task_ids:
+            return []
+        rows = self._database.query(
+            f"SELECT * FROM task_rules WHERE username = ? AND task_id IN ({', '.join('?' * len(task_ids))})",
+            [username] + task_ids
+        )
+        return [_rule_from_row(row) for row in rows]
+
+    def advance(self, rule_id, task_id, next_task_id, deadline):
+        with self._database.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE task_rules SET task_id = ?, deadline = ? WHERE id = ? AND task_id IS ?",
+                (str(next_task_id), _to_sql_time(deadline), str(rule_id),
+                 str(task_id) if task_id else None)
+            )
+            return cursor.rowcount == 1
+
+    def delete(self, username, rule_id):
+        with self._database.transaction() as connection:
+            cursor = connection.execute(
+                "DELETE FROM task_rules WHERE id = ? AND username = ?", (str(rule_id), username)
+            )
+            return cursor.rowcount == 1
@@ -0,0 +1,170 @@
+"""Streaming import and export of a user's tasks as CSV or JSON Lines.
+
+    python src/task_transfer.py import alice tasks.csv
+    python src/task_transfer.py export alice --format jsonl --output tasks.jsonl
+
+Rows are read, validated and inserted in batches, and exported tasks are
+read from the database batch by batch, so memory use does not grow with
+the number of tasks. Exported files can be imported again; tasks whose
+_id already exists are skipped.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from itertools import islice
+from Class import Task, ToDoListManager, get_todo_manager
+from storage import parse_id
+
+FORMATS = ["csv", "jsonl"]
+EXPORT_COLUMNS = ["_id"] + ToDoListManager.EXPORT_FIELDS
+PRIORITIES = ["rendah", "sedang", "tinggi"]
+BATCH_SIZE = 1000
+# Jumlah maksimum pesan error baris yang disimpan di laporan impor
+MAX_REPORTED_ERRORS = 100
+
+
+def format_from_filename(filename):
+    """Guess the format from a file extension"""
+    return "jsonl" if filename.lower().endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+
+def _read_rows(stream, file_format):
+    """Yield (line number, row) pairs; JSON Lines rows are returned undecoded"""
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_number, line in enumerate(stream, 1):
+            if line.strip():
+                yield line_number, line
+
+
+def row_to_task(row, username, now):
+    """Validate a row and build its Task; raise ValueError if it is invalid"""
+    if isinstance(row, str):
+        row = json.loads(row)
+        if not isinstance(row, dict):
+            raise ValueError("baris JSON harus berupa objek")
+
+    name = str(row.get("name") or "").strip()
+    if not name:
+        raise ValueError("nama tugas kosong")
+    priority = str(row.get("priority") or "").strip()
+    if priority not in PRIORITIES:
+        raise ValueError(f"prioritas '{priority}' tidak dikenal")
+    if not row.get("deadline"):
+        raise ValueError("deadline kosong")
+    deadline = datetime.fromisoformat(row["deadline"])
+    if deadline.tzinfo is not None:
+        # Deadline di aplikasi disimpan sebagai waktu lokal tanpa zona waktu
+        deadline = deadline.astimezone().replace(tzinfo=None)
+    task_id = parse_id(row["_id"]) if row.get("_id") else None
+
+    return Task(
+        name=name,
+        description=row.get("description") or "",
+        priority=priority,
+        deadline=deadline,
+        username=username,
+        task_id=task_id,
+        now=now
+    )
+
+
+def _valid_tasks(stream, file_format, username, report):
+    """Yield a Task for every valid row and record the invalid ones in report"""
+    # Satu waktu acuan untuk seluruh impor, sehingga tipe tugas dihitung secara konsisten
+    now = datetime.now()
+    for line_number, row in _read_rows(stream, file_format):
+        try:
+            yield row_to_task(row, username, now)
+        except (ValueError, TypeError) as e:
+            report["invalid"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"baris": line_number, "error": str(e)})
+
+
+def import_tasks(todo_manager, stream, file_format, batch_size=BATCH_SIZE):
+    """Import tasks from a text stream in batches; return a report of the counts and row errors"""
+    report = {"imported": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    tasks = _valid_tasks(stream, file_format, todo_manager.username, report)
+    while True:
+        batch = list(islice(tasks, batch_size))
+        if not batch:
+            return report
+        inserted = todo_manager.add_tasks(batch)
+        report["imported"] += inserted
+        report["duplicates"] += len(batch) - inserted
+
+
+def _export_row(task):
+    """Convert a task document to a row of plain strings and numbers"""
+    row = {column: task.get(column) for column in EXPORT_COLUMNS}
+    row["_id"] = str(row["_id"])
+    row["deadline"] = row["deadline"].isoformat()
+    return row
+
+
+def export_tasks(todo_manager, file_format, batch_size=BATCH_SIZE):
+    """Yield the user's tasks as CSV or JSON Lines text, one line at a time"""
+    tasks = todo_manager.iter_tasks(batch_size)
+    if file_format == "jsonl":
+        for task in tasks:
+            yield json.dumps(_export_row(task), ensure_ascii=False) + "\n"
+        return
+
+    # Satu buffer dipakai ulang untuk setiap baris CSV
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for task in tasks:
+        writer.writerow(_export_row(task))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Tidak ada tugas: hanya header yang dikeluarkan
+        yield buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="import tasks from a file ('-' for stdin)")
+    import_parser.add_argument("username")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    import_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    export_parser = subparsers.add_parser("export", help="export tasks to a file or stdout")
+    export_parser.add_argument("username")
+    export_parser.add_argument("--format", choices=FORMATS, default="csv")
+    export_parser.add_argument("--output", help="write to this file instead of stdout")
+    export_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    todo_manager = get_todo_manager(args.username)
+    if args.command == "import":
+        file_format = args.format or format_from_filename(args.file)
+        if args.file == "-":
+            report = import_tasks(todo_manager, sys.stdin, file_format, args.batch_size)
+        else:
+            with open(args.file, newline="", encoding="utf-8-sig") as f:
+                report = import_tasks(todo_manager, f, file_format, args.batch_size)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+        try:
+            output.writelines(export_tasks(todo_manager, args.format, args.batch_size))
+        finally:
+            if args.output:
+                output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import pytz
+import streamlit as st
+from Class import *
+from storage import ARCHIVE_AFTER_DAYS, ARCHIVE_TTL_DAYS
+
+todo_manager = get_todo_manager(st.session_state.username)
+
+st.title("Arsip Tugas", anchor=False)
+st.markdown("---")
+st.caption(
+    f"Tugas yang terlewat lebih dari {ARCHIVE_AFTER_DAYS} hari dipindahkan ke arsip "
+    f"dan dihapus permanen {ARCHIVE_TTL_DAYS} hari setelah diarsipkan."
+)
+
+# Arsip hanya dibaca ketika halaman ini dibuka, satu halaman setiap kali
+cursor_stack = st.session_state.setdefault("archive-cursors", [])
+page = todo_manager.load_archive_page(cursor_stack[-1] if cursor_stack else None)
+
+if not page["tasks"] and not cursor_stack:
+    st.info("Belum ada tugas di arsip.")
+else:
+    jakarta = pytz.timezone('Asia/Jakarta')
+    st.table([
+        {
+            "Nama": task["name"],
+            "Prioritas": task["priority"],
+            "Poin": task["point"],
+            "Deadline": task["deadline"].strftime("%d %b %Y %H:%M"),
+            # archived_at tersimpan dalam UTC
+            "Diarsipkan": pytz.utc.localize(task["archived_at"]).astimezone(jakarta).strftime("%d %b %Y"),
+        }
+        for task in page["tasks"]
+    ])
+
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    if col_prev.button("Sebelumnya", key="archive-prev", disabled=not cursor_stack):
+        cursor_stack.pop()
+        st.rerun()
+    col_info.caption(f"Halaman {len(cursor_stack) + 1}")
+    if col_next.button("Berikutnya", key="archive-next", disabled=page["next_cursor"] is None):
+        cursor_stack.append(page["next_cursor"])
+        st.rerun()
@@ -1,34 +1,54 @@
+import concurrent.futures
+import pytz
 import streamlit as st
-import pandas as pd
+from datetime import datetime
 from Class import *
+from storage import READ_TIMEOUT, run_concurrently
+
+
+def ordered_chart(mark, x_title, x_values, y_title, y_values):
+    """Vega-Lite spec of a chart that keeps the x values in the given order"""
+    return {
+        "mark": {"type": mark, "point": mark == "line"},
+        "data": {"values": [{"x": x, "y": y} for x, y in zip(x_values, y_values)]},
+        "encoding": {
+            "x": {"field": "x", "type": "ordinal", "sort": None, "title": x_title},
+            "y": {"field": "y", "type": "quantitative", "title": y_title},
+        },
+    }
+
 
 st.title("Statistik Poin Harian", anchor=False)
-user_manager = UserManager() 
-# Mendapatkan data poin harian dari user_manager
-points = user_manager.get_daily_points(st.session_state.username)
+user_manager = get_user_manager()
+username = st.session_state.username
+# Poin harian dan riwayat mingguan tidak saling bergantung, jadi dibaca secara paralel
+# (session_state hanya boleh dibaca di thread skrip, bukan di dalam lambda)
+try:
+    results = run_concurrently({
+        "daily": lambda: user_manager.get_daily_points(username),
+        "weekly": lambda: user_manager.get_weekly_points(username, weeks=8),
+    })
+except concurrent.futures.TimeoutError:
+    st.error(
+        f"Data poin tidak dapat dimuat dalam {READ_TIMEOUT:g} detik. Coba muat ulang halaman beberapa saat lagi."
+    )
+    st.stop()
+points = results["daily"]
 
 if all(value == 0 for value in points.values()):
     st.warning("Minggu ini belum menyelesaikan tugas. Tidak ada data poin yang tersedia untuk ditampilkan.")
 else:
-    # Membuat DataFrame dari data poin
-    df_points = pd.DataFrame(list(points.items()), columns=['Hari', 'Poin'])
-    
-    # Membuat urutan hari secara manual
-    order = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+    # Urutan hari mengikuti urutan dict poin (Senin sampai Minggu)
+    order = list(points)
     
-    # Mengatur kategori hari untuk mengatur urutan
-    df_points['Hari'] = pd.Categorical(df_points['Hari'], categories=order, ordered=True)
-    
-    # Mengurutkan DataFrame berdasarkan kategori Hari
-    df_points = df_points.sort_values('Hari')
-    
-    # Menampilkan grafik batang
+    # Menampilkan grafik garis; data dikirim sebagai list biasa dengan urutan hari tetap
     st.subheader("Grafik Poin Harian", anchor=False)
-    st.line_chart(df_points.set_index('Hari'))
+    st.vega_lite_chart(ordered_chart("line", "Hari", order, "Poin", list(points.values())))
     
-    # Membandingkan poin hari ini dengan hari kemarin
-    hari_ini = order[(pd.Timestamp.now().weekday()) % 7]  # Hari ini
-    hari_kemarin = order[pd.Timestamp.now().weekday() - 1]  # Hari kemarin
+    # Membandingkan poin hari ini dengan hari kemarin (hari dihitung dalam zona waktu poin diberikan)
+    weekday = datetime.now(pytz.timezone('Asia/Jakarta')).weekday()
+    hari_ini = order[weekday]  # Hari ini
+    hari_kemarin = order[weekday - 1]  # Hari kemarin
 
     # Mendapatkan poin hari ini dan hari kemarin
     poin_hari_ini = points.get(hari_ini, 0)
@@ -44,4 +64,14 @@ else:
     
     # Menampilkan data dalam tabel
     st.subheader("Tabel Poin Harian", anchor=False)
-    st.table(df_points)
\ No newline at end of file
+    st.table({"Hari": order, "Poin": list(points.values())})
+
+# Menampilkan riwayat poin beberapa minggu terakhir dari rollup mingguan
+st.subheader("Riwayat Poin Mingguan", anchor=False)
+weekly_points = results["weekly"]
+st.vega_lite_chart(
+    ordered_chart(
+        "bar", "Minggu", [week["week_start"].strftime("%d %b %Y") for week in weekly_points],
+        "Poin", [week["total"] for week in weekly_points]
+    )
+)
@@ -0,0 +1,48 @@
+import io
+import tempfile
+import streamlit as st
+from Class import *
+from task_transfer import FORMATS, format_from_filename, import_tasks, export_tasks
+
+todo_manager = get_todo_manager(st.session_state.username)
+
+st.title("Impor & Ekspor Tugas", anchor=False)
+st.markdown("---")
+
+st.subheader("Impor", anchor=False)
+st.caption("Kolom: name, description, priority (rendah/sedang/tinggi), deadline (ISO 8601), _id (opsional)")
+uploaded_file = st.file_uploader("File CSV atau JSON Lines", type=["csv", "jsonl", "json", "ndjson"])
+
+if uploaded_file and st.button("Impor Tugas", type="primary"):
+    # File dibaca baris demi baris dan disimpan per batch
+    stream = io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline="")
+    with st.spinner("Mengimpor tugas..."):
+        report = import_tasks(todo_manager, stream, format_from_filename(uploaded_file.name))
+    st.success(
+        f"{report['imported']} tugas diimpor, {report['duplicates']} sudah ada, "
+        f"{report['invalid']} baris tidak valid."
+    )
+    if report["errors"]:
+        with st.expander("Baris yang tidak valid"):
+            st.table(report["errors"])
+
+st.subheader("Ekspor", anchor=False)
+export_format = st.radio("Format", FORMATS, format_func=str.upper, horizontal=True)
+
+
+def build_export():
+    """Write the export to a spooled file so only large exports leave memory"""
+    output = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    for chunk in export_tasks(todo_manager, export_format):
+        output.write(chunk.encode("utf-8"))
+    output.seek(0)
+    return output
+
+
+# Ekspor baru dibuat ketika tombol diklik, bukan di setiap rerun
+st.download_button(
+    "Unduh Tugas",
+    data=build_export,
+    file_name=f"tugas_{st.session_state.username}.{export_format}",
+    mime="text/csv" if export_format == "csv" else "application/x-ndjson",
+)
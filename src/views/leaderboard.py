@@ -0,0 +1,36 @@
+import streamlit as st
+from Class import *
+from storage import LEADERBOARD_RANK_LIMIT
+
+user_manager = get_user_manager()
+username = st.session_state.username
+
+st.title("Leaderboard Mingguan", anchor=False)
+st.markdown("---")
+
+# Dibaca dari rollup poin mingguan lewat index, bukan dijumlahkan dari semua pengguna
+leaderboard = user_manager.get_leaderboard(username)
+st.caption(f"Poin sejak {leaderboard['week_start'].strftime('%d %b %Y %H:%M')} (reset setiap Senin pukul 01:00).")
+
+standing = leaderboard["user"]
+if standing is None:
+    st.info("Minggu ini kamu belum mendapat poin. Selesaikan tugas untuk masuk leaderboard!")
+else:
+    col_rank, col_points = st.columns(2)
+    col_rank.metric("Peringkatmu", f"#{standing['rank']}" if standing["rank"] else f"> {LEADERBOARD_RANK_LIMIT}")
+    col_points.metric("Poinmu Minggu Ini", standing["total"])
+
+if not leaderboard["top"]:
+    st.warning("Belum ada pengguna yang mendapat poin minggu ini.")
+else:
+    # Nilai yang sama berbagi peringkat, sama seperti perhitungan peringkatmu
+    rows = []
+    for index, entry in enumerate(leaderboard["top"]):
+        if index == 0 or entry["total"] != leaderboard["top"][index - 1]["total"]:
+            rank = index + 1
+        rows.append({
+            "Peringkat": rank,
+            "Pengguna": f"{entry['username']} (kamu)" if entry["username"] == username else entry["username"],
+            "Poin": entry["total"],
+        })
+    st.table(rows)
@@ -0,0 +1,61 @@
+import streamlit as st
+from Class import query_cache, manager_cache
+from instrumentation import INSTRUMENTATION_ENABLED, ADMIN_USERS, metrics
+
+st.title("Metrik Database", anchor=False)
+
+if st.session_state.username not in ADMIN_USERS:
+    st.error("Halaman ini hanya untuk admin.")
+    st.stop()
+
+if not INSTRUMENTATION_ENABLED:
+    st.info("Instrumentasi tidak aktif. Jalankan aplikasi dengan TODO_INSTRUMENTATION=1.")
+    st.stop()
+
+rows = metrics.snapshot()
+if not rows:
+    st.info("Belum ada operasi yang tercatat.")
+else:
+    # Tabel operasi, diurutkan dari total waktu terbesar
+    st.subheader("Operasi Penyimpanan", anchor=False)
+    st.dataframe(
+        [
+            {
+                "Operasi": row["operation"],
+                "Panggilan": row["calls"],
+                "Gagal": row["errors"],
+                "Rata-rata (ms)": row["mean_ms"],
+                "p95 (ms)": row["p95_ms"],
+                "Dokumen": row["documents"],
+                "Halaman": ", ".join(f"{page} ({count})" for page, count in row["pages"].items()),
+            }
+            for row in rows
+        ],
+        use_container_width=True,
+    )
+
+# Hit/miss cache tingkat proses (query per pengguna dan objek manager)
+st.subheader("Cache", anchor=False)
+caches = {"query": query_cache.stats(), "manager": manager_cache.stats()}
+st.dataframe(
+    [
+        {
+            "Cache": name,
+            "Hit": stats["hits"],
+            "Miss": stats["misses"],
+            "Hit rate": f"{stats['hits'] / (stats['hits'] + stats['misses']):.0%}" if stats["hits"] + stats["misses"] else "-",
+            "Entri": stats["size"],
+        }
+        for name, stats in caches.items()
+    ],
+    use_container_width=True,
+)
+
+st.subheader("Prometheus", anchor=False)
+prometheus_text = metrics.prometheus_text(caches)
+st.download_button("Unduh metrics.txt", prometheus_text, file_name="metrics.txt")
+st.code(prometheus_text, language="text")
+
+if st.button("Reset Metrik"):
+    metrics.reset()
+    st.rerun()
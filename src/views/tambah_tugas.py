@@ -1,7 +1,11 @@
 import streamlit as st
 from Class import *
 
-todo_manager = ToDoListManager(st.session_state.username)
+todo_manager = get_todo_manager(st.session_state.username)
+
+# Label untuk ToDoListManager.RECURRENCE_FREQUENCIES dan hari (indeks datetime.weekday())
+FREQUENCY_LABELS = {"daily": "Setiap hari", "weekly": "Setiap minggu", "interval": "Setiap beberapa hari"}
+WEEKDAY_LABELS = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
 
 st.title("Tambah Tugas Baru", anchor=False)
 st.markdown("---")
@@ -11,6 +15,20 @@ task_priority = st.selectbox("Prioritas", ["rendah", "sedang", "tinggi"])
 task_deadline = st.date_input("Tanggal Deadline")
 deadline_time = st.time_input("Waktu Deadline", value=None)
 
+# Tugas berulang disimpan sebagai satu aturan; hanya okurensi berikutnya yang masuk daftar tugas
+recurring = st.toggle("Ulangi Tugas")
+if recurring:
+    frequency = st.selectbox("Pengulangan", todo_manager.RECURRENCE_FREQUENCIES, format_func=FREQUENCY_LABELS.get)
+    weekdays = []
+    interval_days = 1
+    if frequency == "weekly":
+        weekdays = st.multiselect(
+            "Hari", range(7), format_func=lambda day: WEEKDAY_LABELS[day]
+        )
+    elif frequency == "interval":
+        interval_days = st.number_input("Setiap berapa hari", min_value=2, value=2, step=1)
+    st.caption("Tanggal dan waktu deadline menjadi okurensi pertama; tugas berikutnya dibuat saat tugas ini selesai atau terlewat.")
+
 if st.button("Tambahkan Tugas", type="primary"):
     if task_name and task_description and task_priority and task_deadline and deadline_time:
         # Kombinasikan tanggal dan waktu untuk mendapatkan deadline dalam datetime
@@ -19,8 +37,21 @@ if st.button("Tambahkan Tugas", type="primary"):
         # Ambil waktu sekarang
         now = datetime.now()
         
+        if recurring:
+            if frequency == "weekly" and not weekdays:
+                st.warning("Pilih minimal satu hari untuk pengulangan mingguan.")
+            else:
+                # Okurensi pertama adalah jadwal berikutnya mulai dari deadline yang dipilih
+                rule = todo_manager.add_recurring_task(
+                    task_name, task_description, task_priority, frequency, deadline_datetime,
+                    weekdays=weekdays, interval_days=int(interval_days)
+                )
+                st.success(
+                    f"Tugas berulang '{task_name}' berhasil ditambahkan, "
+                    f"deadline berikutnya {rule['deadline'].strftime('%d %b %Y %H:%M')}."
+                )
         # Periksa apakah deadline lebih kecil dari waktu sekarang
-        if deadline_datetime < now:
+        elif deadline_datetime < now:
             st.warning("Deadline tidak boleh kurang dari waktu saat ini. Harap pilih deadline yang valid.")
         else:
             # Buat objek tugas baru jika deadline valid
@@ -35,3 +66,30 @@ if st.button("Tambahkan Tugas", type="primary"):
             st.success(f"Tugas '{task_name}' berhasil ditambahkan.")
     else:
         st.warning("Harap isi semua bidang sebelum menambahkan tugas.")
+
+
+def describe_rule(rule):
+    """Human readable schedule of a recurring task rule"""
+    at = rule["start"].strftime("%H:%M")
+    if rule["frequency"] == "weekly":
+        days = ", ".join(WEEKDAY_LABELS[day] for day in rule["weekdays"])
+        return f"Setiap {days} pukul {at}"
+    if rule["frequency"] == "interval":
+        return f"Setiap {rule['interval_days']} hari pukul {at}"
+    return f"Setiap hari pukul {at}"
+
+
+rules = todo_manager.load_recurring_tasks()
+if rules:
+    st.markdown("---")
+    st.subheader("Tugas Berulang", anchor=False)
+    for rule in rules:
+        col_info, col_action = st.columns([4, 1])
+        col_info.markdown(
+            f"**{rule['name']}** · {describe_rule(rule)}  \n"
+            f"Deadline berikutnya: {rule['deadline'].strftime('%d %b %Y %H:%M')}"
+        )
+        if col_action.button("Hentikan", key=f"stop-rule-{rule['_id']}"):
+            todo_manager.delete_recurring_task(rule["_id"])
+            st.toast(f"Tugas berulang '{rule['name']}' dihentikan. Tugas yang sedang berjalan tetap ada.")
+            st.rerun()
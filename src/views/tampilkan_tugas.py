@@ -1,8 +1,44 @@
 import streamlit as st
 from Class import *
+from datetime import datetime, time as dt_time
+from components.task_list import display_tasks, display_search_results
 
-todo_manager = ToDoListManager(st.session_state.username)
+todo_manager = get_todo_manager(st.session_state.username)
+
+# Label pilihan urutan untuk ToDoListManager.SORT_OPTIONS
+SORT_LABELS = {
+    "deadline": "Deadline terdekat",
+    "deadline_desc": "Deadline terjauh",
+    "point_desc": "Poin tertinggi",
+    "point": "Poin terendah",
+    "name": "Nama (A-Z)",
+}
 
 st.title("Daftar Tugas", anchor=False)
 st.markdown("---")
-todo_manager.display_tasks()
\ No newline at end of file
+
+search_text = st.text_input("Cari Tugas", placeholder="Kata pada nama atau deskripsi tugas")
+with st.expander("Filter & Urutkan"):
+    priorities = st.multiselect("Prioritas", ["rendah", "sedang", "tinggi"])
+    deadline_range = st.date_input("Rentang Deadline", value=())
+    point_range = st.slider("Rentang Poin", min_value=1, max_value=15, value=(1, 15))
+    sort = st.selectbox("Urutkan", list(SORT_LABELS), format_func=SORT_LABELS.get)
+
+# Pencarian dan filter dijalankan di database; tanpa filter, tampilkan tab seperti biasa
+search = {}
+if search_text.strip():
+    search["text"] = search_text
+if priorities:
+    search["priorities"] = priorities
+if deadline_range:
+    search["deadline_from"] = datetime.combine(deadline_range[0], dt_time.min)
+    search["deadline_to"] = datetime.combine(deadline_range[-1], dt_time.max)
+if point_range != (1, 15):
+    search["min_point"], search["max_point"] = point_range
+if sort != "deadline":
+    search["sort"] = sort
+
+if search:
+    display_search_results(todo_manager, search)
+else:
+    display_tasks(todo_manager)
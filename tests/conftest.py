@@ -0,0 +1,35 @@
+"""Run the tests against a throwaway SQLite database.
+
+The storage settings are read when storage.py is imported, so they are set
+here before any test imports the application modules.
+"""
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+_DATABASE_DIR = tempfile.TemporaryDirectory()
+os.environ["TODO_STORAGE_BACKEND"] = "sqlite"
+os.environ["TODO_SQLITE_PATH"] = os.path.join(_DATABASE_DIR.name, "test.db")
+os.environ["TODO_ARCHIVE_RUN_INTERVAL_MINUTES"] = "0"
+os.environ["TODO_CHANGE_WATCH"] = "off"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+
+@pytest.fixture
+def username():
+    """A fresh registered user, so tests do not see each other's tasks"""
+    from Class import get_user_manager
+
+    name = f"user-{uuid.uuid4().hex[:8]}"
+    get_user_manager().register(name, "rahasia123")
+    return name
+
+
+@pytest.fixture
+def todo_manager(username):
+    from Class import ToDoListManager
+
+    return ToDoListManager(username)
@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+
+from Class import Repositories, Task
+from archive import archive_missed_tasks
+from storage import ARCHIVE_AFTER_DAYS
+
+
+def test_overdue_tasks_are_archived_whatever_their_stored_type(todo_manager):
+    now = datetime.now()
+    old = now - timedelta(days=ARCHIVE_AFTER_DAYS + 1)
+    # Dibuat dengan waktu lampau, sehingga type tersimpan tetap "common" seperti
+    # tugas pengguna yang tidak pernah membuka daftar tugasnya lagi
+    stale = Task("Lama", "", "rendah", old, todo_manager.username, now=old - timedelta(days=3))
+    recent = Task("Baru", "", "rendah", now + timedelta(days=3), todo_manager.username)
+    todo_manager.add_tasks([stale, recent])
+    assert stale.type == "common"
+
+    archive_missed_tasks()
+
+    remaining = [task["name"] for task in todo_manager.iter_tasks()]
+    assert remaining == ["Baru"]
+    archived = Repositories().tasks.load_archive(todo_manager.username, None, 10, ["name", "type"])
+    assert [(task["name"], task["type"]) for task in archived] == [("Lama", "missed")]
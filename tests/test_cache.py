@@ -0,0 +1,26 @@
+from Class import TTLCache
+
+
+def test_full_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=60, max_entries=3)
+    for key in "abc":
+        cache.get_or_set("alice", key, lambda: key)
+    # "a" dipakai lagi, sehingga "b" yang paling lama tidak dipakai
+    assert cache.get_or_set("alice", "a", lambda: "baru") == "a"
+
+    cache.get_or_set("alice", "d", lambda: "d")
+
+    assert cache.stats()["size"] == 3
+    assert cache.get_or_set("alice", "b", lambda: "dimuat ulang") == "dimuat ulang"
+    assert cache.get_or_set("alice", "a", lambda: "baru") == "a"
+
+
+def test_invalidate_drops_only_that_user():
+    cache = TTLCache(ttl=60)
+    cache.get_or_set("alice", "pages", lambda: 1)
+    cache.get_or_set("bob", "pages", lambda: 2)
+
+    cache.invalidate("alice")
+
+    assert cache.get_or_set("alice", "pages", lambda: 3) == 3
+    assert cache.get_or_set("bob", "pages", lambda: 4) == 2
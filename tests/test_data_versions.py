@@ -0,0 +1,32 @@
+from Class import DataVersions
+
+
+def _versions(writer):
+    versions = DataVersions()
+    versions.writer_id = lambda: writer["id"]
+    return versions
+
+
+def test_session_skips_only_its_own_bumps():
+    writer = {"id": "sesi-a"}
+    versions = _versions(writer)
+
+    versions.bump(["alice"])
+    assert versions.written_only_by("alice", "sesi-a", 0)
+    assert not versions.written_only_by("alice", "sesi-b", 0)
+
+    # Perubahan dari sesi lain (atau dari change watcher) membuat sesi A rerun
+    writer["id"] = None
+    versions.bump(["alice"])
+    assert not versions.written_only_by("alice", "sesi-a", 0)
+    assert not versions.written_only_by("alice", None, 1)
+
+
+def test_old_versions_outside_history_rerun():
+    writer = {"id": "sesi-a"}
+    versions = _versions(writer)
+    for _ in range(DataVersions.HISTORY + 1):
+        versions.bump(["alice"])
+
+    assert not versions.written_only_by("alice", "sesi-a", 0)
+    assert versions.written_only_by("alice", "sesi-a", 1)
@@ -0,0 +1,27 @@
+from instrumentation import InstrumentedRepository, Metrics
+import instrumentation
+
+
+class _Repository:
+    def iter_tasks(self, count):
+        yield from range(count)
+
+
+def _operation(metrics, name):
+    return next(row for row in metrics.snapshot() if row["operation"] == name)
+
+
+def test_generator_calls_record_yielded_documents(monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(instrumentation, "metrics", metrics)
+    repository = InstrumentedRepository(_Repository(), "tasks")
+
+    assert list(repository.iter_tasks(10)) == list(range(10))
+    # Belum tercatat sampai generator selesai atau ditutup
+    partial = repository.iter_tasks(10)
+    next(partial)
+    assert _operation(metrics, "tasks.iter_tasks")["calls"] == 1
+    partial.close()
+
+    row = _operation(metrics, "tasks.iter_tasks")
+    assert (row["calls"], row["documents"], row["errors"]) == (2, 11, 0)
@@ -0,0 +1,39 @@
+import hashlib
+
+from Class import Repositories, get_user_manager
+from passwords import password_service
+
+
+def test_legacy_sha256_hash_is_upgraded_on_login(username):
+    users = Repositories().users
+    users.update_password(username, hashlib.sha256(b"lama123").hexdigest())
+
+    assert get_user_manager().login(username, "salah")[0] is False
+    assert get_user_manager().login(username, "lama123")[0] is True
+
+    upgraded = users.find_by_username(username)["password"]
+    assert upgraded.startswith(password_service.hasher.algorithm + "$")
+    assert get_user_manager().login(username, "lama123")[0] is True
+
+
+def test_register_stores_a_salted_hash(username):
+    get_user_manager().register(username + "-2", "rahasia123")
+
+    first = Repositories().users.find_by_username(username)["password"]
+    second = Repositories().users.find_by_username(username + "-2")["password"]
+    assert first.startswith(password_service.hasher.algorithm + "$")
+    # Kata sandi sama, salt berbeda
+    assert first != second
+
+
+def test_unknown_hash_algorithm_fails_login(username, caplog):
+    Repositories().users.update_password(username, "argon9$abc$def")
+
+    assert get_user_manager().login(username, "rahasia123") == (False, "Invalid username or password")
+    assert "argon9" in caplog.text
+
+
+def test_malformed_hash_fails_login(username):
+    Repositories().users.update_password(username, "scrypt$16384$8$1$bukan-base64$")
+
+    assert get_user_manager().login(username, "rahasia123")[0] is False
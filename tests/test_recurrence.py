@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from Class import FixedClock, next_occurrence
+
+
+def _rule(frequency, start, weekdays=(), interval_days=1):
+    return {"frequency": frequency, "start": start, "weekdays": list(weekdays), "interval_days": interval_days}
+
+
+def test_daily_rule_uses_the_time_of_day_of_its_start():
+    rule = _rule("daily", datetime(2026, 10, 1, 8, 0))
+
+    assert next_occurrence(rule, datetime(2026, 10, 5, 7, 59)) == datetime(2026, 10, 5, 8, 0)
+    assert next_occurrence(rule, datetime(2026, 10, 5, 8, 0)) == datetime(2026, 10, 6, 8, 0)
+
+
+def test_rules_cross_month_and_year_ends():
+    assert next_occurrence(_rule("daily", datetime(2026, 1, 1, 8, 0)), datetime(2026, 1, 31, 9, 0)) \
+        == datetime(2026, 2, 1, 8, 0)
+    assert next_occurrence(_rule("daily", datetime(2024, 1, 1, 8, 0)), datetime(2024, 2, 28, 9, 0)) \
+        == datetime(2024, 2, 29, 8, 0)
+    assert next_occurrence(_rule("interval", datetime(2026, 1, 30, 8, 0), interval_days=3), datetime(2026, 2, 1, 0, 0)) \
+        == datetime(2026, 2, 2, 8, 0)
+    # 2026-12-31 adalah Kamis; Senin berikutnya sudah di tahun baru
+    assert next_occurrence(_rule("weekly", datetime(2026, 1, 1, 8, 0), weekdays=[0]), datetime(2026, 12, 31, 9, 0)) \
+        == datetime(2027, 1, 4, 8, 0)
+
+
+def test_weekly_rule_picks_the_next_listed_weekday():
+    # 2026-10-16 adalah Jumat
+    rule = _rule("weekly", datetime(2026, 10, 1, 17, 0), weekdays=[0, 2])
+
+    assert next_occurrence(rule, datetime(2026, 10, 16, 12, 0)) == datetime(2026, 10, 19, 17, 0)
+    assert next_occurrence(rule, datetime(2026, 10, 19, 17, 0)) == datetime(2026, 10, 21, 17, 0)
+
+
+def test_no_occurrence_before_the_start():
+    start = datetime(2026, 11, 1, 8, 0)
+
+    assert next_occurrence(_rule("daily", start), datetime(2026, 10, 1)) == start
+    assert next_occurrence(_rule("interval", start, interval_days=7), datetime(2026, 10, 1)) == start
+    # 2026-11-01 adalah Minggu; Senin pertama setelahnya
+    assert next_occurrence(_rule("weekly", start, weekdays=[0]), datetime(2026, 10, 1)) == datetime(2026, 11, 2, 8, 0)
+
+
+def _occurrences(todo_manager, name):
+    return [task for task in todo_manager.iter_tasks() if task["name"] == name]
+
+
+def test_missed_occurrences_are_skipped(todo_manager):
+    start = datetime(2026, 10, 1, 8, 0)
+    todo_manager.clock = FixedClock(start - timedelta(hours=1))
+    todo_manager.add_recurring_task("Olahraga", "", "sedang", "daily", start)
+
+    # Pengguna baru kembali tiga hari kemudian: hanya satu okurensi baru, setelah waktu sekarang
+    todo_manager.clock = FixedClock(datetime(2026, 10, 4, 9, 0))
+    todo_manager.update_task_types()
+
+    deadlines = sorted(task["deadline"] for task in _occurrences(todo_manager, "Olahraga"))
+    assert deadlines == [start, datetime(2026, 10, 5, 8, 0)]
+    [rule] = todo_manager.load_recurring_tasks()
+    assert rule["deadline"] == datetime(2026, 10, 5, 8, 0)
+
+
+def test_completing_early_keeps_the_schedule(todo_manager):
+    start = datetime(2026, 10, 1, 8, 0)
+    todo_manager.clock = FixedClock(start - timedelta(days=2))
+    rule = todo_manager.add_recurring_task("Laporan", "", "tinggi", "interval", start, interval_days=7)
+
+    todo_manager.mark_task_done(rule["task_id"])
+
+    [task] = _occurrences(todo_manager, "Laporan")
+    assert task["deadline"] == datetime(2026, 10, 8, 8, 0)
+
+
+def test_a_rule_is_advanced_only_once(todo_manager):
+    start = datetime(2026, 10, 1, 8, 0)
+    todo_manager.clock = FixedClock(start - timedelta(hours=1))
+    todo_manager.add_recurring_task("Rapat", "", "rendah", "daily", start)
+    [stale] = todo_manager.load_recurring_tasks()
+
+    later = datetime(2026, 10, 2, 9, 0)
+    # Dua sesi memproses aturan yang sama dari salinan lama: hanya satu yang membuat okurensi
+    assert todo_manager._advance_rules([dict(stale)], later) == 1
+    assert todo_manager._advance_rules([dict(stale)], later) == 0
+    assert len(_occurrences(todo_manager, "Rapat")) == 2
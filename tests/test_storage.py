@@ -0,0 +1,21 @@
+import concurrent.futures
+import time
+
+import pytest
+
+from storage import run_concurrently
+
+
+def test_results_are_returned_by_name():
+    assert run_concurrently({"a": lambda: 1, "b": lambda: 2}) == {"a": 1, "b": 2}
+
+
+def test_one_deadline_for_all_reads():
+    # Setiap hasil selesai sebelum timeout dihitung dari hasil sebelumnya, tetapi
+    # semuanya jauh setelah timeout dihitung dari awal
+    calls = {name: (lambda delay=delay: time.sleep(delay)) for name, delay in (("a", 0.15), ("b", 0.3), ("c", 0.45))}
+
+    start = time.perf_counter()
+    with pytest.raises(concurrent.futures.TimeoutError):
+        run_concurrently(calls, timeout=0.2)
+    assert time.perf_counter() - start < 0.3
@@ -0,0 +1,21 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from Class import Task
+from storage import SQLITE_PATH
+
+
+def test_page_reads_do_not_wait_for_writers_in_other_processes(todo_manager):
+    todo_manager.add_task(Task("Tugas", "", "sedang", datetime.now() + timedelta(days=3), todo_manager.username))
+    # Koneksi kedua berperan sebagai importer/arsip di proses lain yang sedang menulis
+    writer = sqlite3.connect(SQLITE_PATH, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.perf_counter()
+        pages = todo_manager.load_task_pages()
+        assert time.perf_counter() - start < 1
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+    assert pages["common"]["count"] == 1
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+from Class import Task
+
+
+def test_second_page_continues_after_the_keyset_cursor(todo_manager):
+    page_size = todo_manager.PAGE_SIZE
+    # Deadline sama untuk sebagian tugas, sehingga urutan di batas halaman bergantung pada _id
+    deadline = datetime.now() + timedelta(days=5)
+    tasks = [
+        Task(f"Tugas {i}", "", "sedang", deadline + timedelta(minutes=i // 10), todo_manager.username)
+        for i in range(page_size + 5)
+    ]
+    todo_manager.add_tasks(tasks)
+
+    first = todo_manager.load_task_pages()["common"]
+    assert len(first["tasks"]) == page_size
+    assert first["count"] == page_size + 5
+    assert first["next_cursor"] is not None
+
+    second = todo_manager.load_task_pages({"common": first["next_cursor"]})["common"]
+    assert len(second["tasks"]) == 5
+    assert second["next_cursor"] is None
+
+    seen = [task.task_id for task in first["tasks"] + second["tasks"]]
+    assert sorted(seen) == sorted(task.task_id for task in tasks)
+    keys = [(task.deadline, task.task_id) for task in first["tasks"] + second["tasks"]]
+    assert keys == sorted(keys)
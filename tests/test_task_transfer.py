@@ -0,0 +1,40 @@
+import io
+import uuid
+from datetime import datetime, timedelta
+
+from task_transfer import export_tasks, import_tasks
+
+
+def _csv(rows):
+    """A CSV file of rows valid tasks, each with its own _id"""
+    deadline = (datetime.now() + timedelta(days=3)).replace(microsecond=0).isoformat()
+    lines = ["_id,name,description,priority,deadline"]
+    lines += [f"{uuid.uuid4().hex[:24]},Tugas {i},,sedang,{deadline}" for i in range(rows)]
+    return "\n".join(lines) + "\n"
+
+
+def test_importing_twice_reports_duplicates(todo_manager):
+    data = _csv(10)
+
+    report = import_tasks(todo_manager, io.StringIO(data), "csv")
+    assert (report["imported"], report["duplicates"], report["invalid"]) == (10, 0, 0)
+
+    report = import_tasks(todo_manager, io.StringIO(data), "csv")
+    assert (report["imported"], report["duplicates"], report["invalid"]) == (0, 10, 0)
+
+
+def test_export_round_trip(todo_manager):
+    import_tasks(todo_manager, io.StringIO(_csv(3)), "csv")
+    exported = "".join(export_tasks(todo_manager, "jsonl"))
+
+    assert len(exported.splitlines()) == 3
+    report = import_tasks(todo_manager, io.StringIO(exported), "jsonl")
+    assert (report["imported"], report["duplicates"]) == (0, 3)
+
+
+def test_invalid_rows_are_reported(todo_manager):
+    data = "name,priority,deadline\n,sedang,2030-01-01T10:00\nTugas,penting,2030-01-01T10:00\n"
+
+    report = import_tasks(todo_manager, io.StringIO(data), "csv")
+    assert (report["imported"], report["invalid"]) == (0, 2)
+    assert [error["baris"] for error in report["errors"]] == [2, 3]